@@ -0,0 +1,310 @@
+"""Нагрузочный тест API перевалов.
+
+Заполняет БД до заданного числа перевалов данными в формате фикстуры create_pereval и прогоняет
+смесь запросов с фиксированной параллельностью: в процессе (ASGITransport) или через uvicorn.
+Результат - JSON с пропускной способностью и перцентилями задержки по операциям, который
+удобно сравнивать между коммитами.
+
+    python -m benchmarks.load --perevals 10000 --concurrency 32 --duration 30 \\
+        --mix create=1,get=6,list=2,by_user=1,patch=1,status=1 --transport asgi --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import func, select
+
+from src.core.config import settings
+from src.db.db import async_session_null_pool
+from src.models import PerevalAdded, Status, User
+from src.schemas.submit import SubmitDataRequest
+from src.services.db_service import SubmitService
+from tests.factories import generate_pereval
+
+OPERATIONS = ("create", "get", "list", "by_user", "patch", "status")
+DEFAULT_MIX = "create=1,get=6,list=2,by_user=1,patch=1,status=1"
+
+# Списки состояния, из которых операции выбирают перевал или email
+OPERATION_TARGETS = {"get": "pereval_ids", "by_user": "emails", "patch": "new_ids", "status": "pereval_ids"}
+
+
+class BenchmarkState:
+    """Идентификаторы и email, к которым обращаются операции; пополняется созданными перевалами."""
+
+    def __init__(self, run_id: str, pereval_ids: List[int], new_ids: List[int], emails: List[str]):
+        self.run_id = run_id
+        self.pereval_ids = pereval_ids
+        self.new_ids = new_ids
+        self.emails = emails
+        self._counter = 0
+
+    def has_targets(self, operation: str) -> bool:
+        attribute = OPERATION_TARGETS.get(operation)
+        return attribute is None or bool(getattr(self, attribute))
+
+    def unique_pereval(self) -> Dict[str, Any]:
+        # Название уникально в пределах запуска, иначе запрос вернет дубликат
+        self._counter += 1
+        data = generate_pereval()
+        data["title"] = f"Bench {self.run_id}-{self._counter}"
+        return data
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Неизвестная операция {name}; допустимы: {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def seed(target: int, run_id: str) -> BenchmarkState:
+    """Досоздает перевалы до target пакетами и загружает выборку ID и email для запросов."""
+    async with async_session_null_pool() as db:
+        existing = (await db.execute(select(func.count(PerevalAdded.id)))).scalar_one()
+        missing = max(target - existing, 0)
+
+        state = BenchmarkState(run_id, [], [], [])
+        while missing > 0:
+            size = min(missing, settings.batch_max_items)
+            items = [SubmitDataRequest(**state.unique_pereval()) for _ in range(size)]
+            await SubmitService(db).create_perevals_batch(items)
+            missing -= size
+
+        rows = (await db.execute(
+            select(PerevalAdded.id, PerevalAdded.status).order_by(func.random()).limit(10000)
+        )).all()
+        state.pereval_ids = [row.id for row in rows]
+        state.new_ids = [row.id for row in rows if row.status == Status.new]
+        state.emails = list((await db.execute(select(User.email).order_by(func.random()).limit(10000))).scalars())
+
+    return state
+
+
+# Операции нагрузки: каждая выполняет один HTTP-запрос
+
+async def op_create(client: httpx.AsyncClient, state: BenchmarkState) -> httpx.Response:
+    response = await client.post("/submit/submitData", json=state.unique_pereval())
+    if response.status_code == 200 and "user" in response.json():
+        pereval_id = int(response.json()["share_link"].rsplit("/", 1)[-1])
+        state.pereval_ids.append(pereval_id)
+        state.new_ids.append(pereval_id)
+    return response
+
+
+async def op_get(client: httpx.AsyncClient, state: BenchmarkState) -> httpx.Response:
+    return await client.get(f"/submit/submitData/{random.choice(state.pereval_ids)}")
+
+
+async def op_list(client: httpx.AsyncClient, state: BenchmarkState) -> httpx.Response:
+    return await client.get("/submit/submitData/", params={"limit": settings.page_size_default})
+
+
+async def op_by_user(client: httpx.AsyncClient, state: BenchmarkState) -> httpx.Response:
+    return await client.get("/submit/submitData/by_user/", params={"user__email": random.choice(state.emails)})
+
+
+async def op_patch(client: httpx.AsyncClient, state: BenchmarkState) -> httpx.Response:
+    data = state.unique_pereval()
+    data.pop("user")
+    return await client.patch(f"/submit/submitData/{random.choice(state.new_ids)}", json=data)
+
+
+async def op_status(client: httpx.AsyncClient, state: BenchmarkState) -> httpx.Response:
+    # pending можно выставлять повторно, поэтому перевал остается доступным для следующих смен статуса,
+    # но не для patch: редактируется только статус new
+    pereval_id = random.choice(state.pereval_ids)
+    response = await client.patch(f"/submit/submitData/update-status/{pereval_id}", params={"status": "pending"})
+    if response.status_code == 200 and pereval_id in state.new_ids:
+        state.new_ids.remove(pereval_id)
+    return response
+
+
+OPERATION_FUNCTIONS: Dict[str, Callable[[httpx.AsyncClient, BenchmarkState], Awaitable[httpx.Response]]] = {
+    "create": op_create,
+    "get": op_get,
+    "list": op_list,
+    "by_user": op_by_user,
+    "patch": op_patch,
+    "status": op_status,
+}
+
+
+async def drive(client: httpx.AsyncClient, state: BenchmarkState, mix: Dict[str, float], concurrency: int,
+                duration: float, requests: Optional[int]) -> Dict[str, Any]:
+    """Запросы из смеси mix в concurrency параллельных потоках до истечения duration или числа requests."""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    issued = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal issued
+        while time.perf_counter() < deadline and (requests is None or issued < requests):
+            issued += 1
+            name = random.choices(names, weights)[0]
+            if not state.has_targets(name):
+                # Выбирать не из чего (пустая БД или перевалы new закончились): вместо операции - create
+                name = "create"
+                latencies.setdefault(name, [])
+                errors.setdefault(name, 0)
+            start = time.perf_counter()
+            try:
+                response = await OPERATION_FUNCTIONS[name](client, state)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            if failed:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {"elapsed": elapsed, "latencies": latencies, "errors": errors}
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Метод ближайшего ранга: наименьшее значение, не меньше которого q% наблюдений
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return round(ordered[index], 3)
+
+
+def summarize(run: Dict[str, Any]) -> Dict[str, Any]:
+    elapsed = run["elapsed"]
+    routes = {}
+    for name, values in run["latencies"].items():
+        routes[name] = {
+            "count": len(values),
+            "errors": run["errors"][name],
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "max_ms": round(max(values), 3) if values else None,
+        }
+    total = sum(route["count"] for route in routes.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "errors": sum(route["errors"] for route in routes.values()),
+        "rps": round(total / elapsed, 2),
+        "routes": routes,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                await client.get("/api/openapi")
+                return
+            except httpx.TransportError:
+                if time.perf_counter() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    state = await seed(args.perevals, uuid.uuid4().hex[:8])
+    mix = args.mix
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    server = None
+    if args.transport == "uvicorn":
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            env={**os.environ, "reload": "false"}
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        await wait_until_ready(base_url)
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver", timeout=60)
+
+    try:
+        async with client:
+            if args.warmup:
+                await drive(client, state, mix, args.concurrency, args.warmup, None)
+            run = await drive(client, state, mix, args.concurrency, args.duration, args.requests)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "commit": git_commit(),
+        "transport": args.transport,
+        "workers": args.workers if args.transport == "uvicorn" else 1,
+        "perevals": args.perevals,
+        "concurrency": args.concurrency,
+        "mix": mix,
+        **summarize(run),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API перевалов")
+    parser.add_argument("--perevals", type=int, default=1000, help="минимальное число перевалов в БД")
+    parser.add_argument("--concurrency", type=int, default=16, help="число параллельных клиентов")
+    parser.add_argument("--duration", type=float, default=10, help="длительность замера, секунд")
+    parser.add_argument("--requests", type=int, default=None, help="ограничение общего числа запросов")
+    parser.add_argument("--warmup", type=float, default=2, help="прогрев перед замером, секунд")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help="веса операций")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="воркеры uvicorn")
+    parser.add_argument("--output", help="файл для JSON-результата (по умолчанию stdout)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    result = asyncio.run(run_benchmark(args))
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Накладные расходы middleware на один запрос.
+
+Один и тот же минимальный эндпоинт вызывается напрямую через ASGI (без сети и БД) в трех вариантах:
+без middleware, с прежней парой @app.middleware("http") для ошибок + BaseHTTPMiddleware для метрик
+и с RequestContextMiddleware. Результат - JSON со временем на запрос и разницей с вариантом без middleware.
+
+    python -m benchmarks.middleware_overhead --requests 20000 --output overhead.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from src.core.context import request_scope
+from src.core.metrics import record_request, request_db_stats
+from src.core.middleware import RequestContextMiddleware
+
+
+def _base_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping/{item_id}")
+    async def ping(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+def build_plain_app() -> FastAPI:
+    return _base_app()
+
+
+class _LegacyMetricsMiddleware(BaseHTTPMiddleware):
+    # Прежний вариант метрик запросов - на базе BaseHTTPMiddleware
+    async def dispatch(self, request: Request, call_next):
+        stats = [0, 0.0]
+        scope_token = request_scope.set(request.scope)
+        stats_token = request_db_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            request_db_stats.reset(stats_token)
+            request_scope.reset(scope_token)
+            route = getattr(request.scope.get("route"), "path", None) or "<unmatched>"
+            record_request(request.method, route, status, time.perf_counter() - start, stats)
+
+
+def build_legacy_app() -> FastAPI:
+    app = _base_app()
+    app.add_middleware(_LegacyMetricsMiddleware)
+
+    @app.middleware("http")
+    async def error_middleware(request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse(status_code=500, content={"message": "Internal server error"})
+
+    return app
+
+
+def build_request_context_app() -> FastAPI:
+    app = _base_app()
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+VARIANTS = {
+    "none": build_plain_app,
+    "legacy": build_legacy_app,
+    "request_context": build_request_context_app,
+}
+
+
+async def call(app, path: str) -> int:
+    """Один запрос через ASGI-интерфейс приложения; возвращает код ответа."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, requests: int) -> float:
+    """Среднее время одного запроса, микросекунд."""
+    start = time.perf_counter()
+    for n in range(requests):
+        await call(app, f"/ping/{n}")
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def run(requests: int, warmup: int, repeats: int) -> Dict[str, Any]:
+    apps = {name: build() for name, build in VARIANTS.items()}
+    for app in apps.values():
+        status = await call(app, "/ping/1")
+        if status != 200:
+            raise RuntimeError(f"Неожиданный код ответа {status}")
+        await measure(app, warmup)
+
+    # Варианты чередуются, чтобы дрейф окружения влиял на них одинаково; берется лучший повтор
+    timings: Dict[str, List[float]] = {name: [] for name in apps}
+    for _ in range(repeats):
+        for name, app in apps.items():
+            timings[name].append(await measure(app, requests))
+
+    best = {name: min(values) for name, values in timings.items()}
+    return {
+        "requests": requests,
+        "repeats": repeats,
+        "variants": {
+            name: {
+                "us_per_request": round(value, 2),
+                "overhead_us": round(value - best["none"], 2),
+            }
+            for name, value in best.items()
+        },
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Накладные расходы middleware на запрос")
+    parser.add_argument("--requests", type=int, default=5000, help="запросов в одном замере")
+    parser.add_argument("--warmup", type=int, default=500, help="запросов на прогрев")
+    parser.add_argument("--repeats", type=int, default=5, help="число замеров каждого варианта")
+    parser.add_argument("--output", help="файл для JSON-результата (по умолчанию stdout)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    result = asyncio.run(run(args.requests, args.warmup, args.repeats))
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Сериализация списка SubmitDataResponse.
+
+Сравнивает путь FastAPI по умолчанию (повторная проверка по response_model, jsonable_encoder
+и json.dumps) с однократной валидацией в сервисе и выводом через закэшированный TypeAdapter,
+а также json и orjson для словарей пути чтения без ORM. Без БД и сети.
+
+    python -m benchmarks.serialization --items 10000 --output serialization.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.core.serialization import dump_json, dump_model
+from src.schemas.submit import SubmitDataResponse
+from tests.factories import generate_pereval
+
+
+def build_items(count: int) -> List[Dict[str, Any]]:
+    """Словари ответа в том виде, в каком их строит PerevalReader."""
+    now = datetime.now()
+    items = []
+    for n in range(count):
+        data = generate_pereval()
+        data.update(
+            message="Данные перевалов",
+            share_link=f"http://localhost:8000/submit/get/{n}",
+            status="new",
+            add_time=now,
+            updated_at=now,
+            version=1,
+        )
+        items.append(data)
+    return items
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def measure(function: Callable[[], Any], repeats: int) -> float:
+    """Лучшее время из repeats запусков, миллисекунд."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(count: int, repeats: int) -> Dict[str, Any]:
+    items = build_items(count)
+    models = [SubmitDataResponse(**item) for item in items]
+    field = create_model_field(name="Response_get_all_perevals", type_=List[SubmitDataResponse], mode="serialization")
+
+    def fastapi_default(response_class):
+        def render():
+            content = asyncio.run(serialize_response(field=field, response_content=models))
+            return response_class(content).body
+        return render
+
+    variants = {
+        # Модели из сервиса: повторная проверка FastAPI и рендер ответа
+        "models_fastapi_json": fastapi_default(JSONResponse),
+        "models_fastapi_orjson": fastapi_default(ORJSONResponse),
+        # Модели из сервиса: сразу в байты через TypeAdapter (model_response)
+        "models_type_adapter": lambda: dump_model(List[SubmitDataResponse], models),
+        # Словари пути чтения без ORM
+        "dicts_json": lambda: json.dumps(
+            items, ensure_ascii=False, separators=(",", ":"), default=_json_default
+        ).encode("utf-8"),
+        "dicts_orjson": lambda: dump_json(items),
+    }
+
+    timings = {name: measure(function, repeats) for name, function in variants.items()}
+    baseline = timings["models_fastapi_json"]
+    return {
+        "items": count,
+        "repeats": repeats,
+        "variants": {
+            name: {"ms": round(value, 2), "speedup": round(baseline / value, 2)}
+            for name, value in timings.items()
+        },
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Сериализация списка SubmitDataResponse")
+    parser.add_argument("--items", type=int, default=10000, help="размер списка")
+    parser.add_argument("--repeats", type=int, default=5, help="число замеров каждого варианта")
+    parser.add_argument("--output", help="файл для JSON-результата (по умолчанию stdout)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    result = run(args.items, args.repeats)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
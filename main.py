@@ -1,82 +1,53 @@
-import atexit
+import asyncio
 import logging
-import logging.config
-import logging.handlers
-from queue import Queue
 from contextlib import asynccontextmanager
 from typing import AsyncContextManager
 
 import uvicorn
 from fastapi import FastAPI, Request, HTTPException
-from starlette.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
-from src.core.config import uvicorn_options
+from src.core.config import uvicorn_options, settings
+from src.db.notify import pereval_listener
 from src.api.v1 import api_router
-from src.core.logger import setup_logging, LOGGING_CONFIG
+from src.core.logger import setup_logging
+from src.core.metrics import snapshot_writer, prepare_metrics_dir
+from src.core.middleware import RequestContextMiddleware
+from src.services.event_feed import pereval_feed
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncContextManager[None]:
-    logging.config.dictConfig(LOGGING_CONFIG)
-    log_queue = Queue(-1)
-
-    # Получаем корневой логгер и находим обработчик очереди
-    root_logger = logging.getLogger()
-    queue_handler = logging.handlers.QueueHandler(log_queue)
-    listener = logging.handlers.QueueListener(log_queue, *root_logger.handlers)
-
-    # Добавляем QueueHandler к корневому логгеру
-    root_logger.addHandler(queue_handler)
-
     try:
-        listener.start()
-        atexit.register(listener.stop)
+        # Подписка на изменения перевалов, сделанные другими воркерами
+        if settings.pereval_notify_enabled:
+            await pereval_listener.start()
+        await pereval_feed.start()
+        await asyncio.to_thread(prepare_metrics_dir)
+        await snapshot_writer.start()
         yield
     finally:
-        listener.stop()
+        await snapshot_writer.stop()
+        await pereval_feed.stop()
+        await pereval_listener.stop()
 
 
 setup_logging()
-app = FastAPI(lifespan=lifespan, docs_url="/api/openapi")
+app = FastAPI(lifespan=lifespan, docs_url="/api/openapi", default_response_class=ORJSONResponse)
 logger = logging.getLogger("my_app")
 
 # Добавление роутеров
 app.include_router(api_router)
 
-
-# Middleware для обработки ошибок
-@app.middleware("http")
-async def error_middleware(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except HTTPException as exc:
-        logger.error(f"{request.url} | HTTP Exception: {exc.detail}")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={"message": exc.detail}
-        )
-    except Exception as e:
-        logger.error(f"{request.url} | Error in application: {e}")
-        return JSONResponse(
-            status_code=500,
-            content={"message": "Internal server error"}
-        )
+# Контекст запроса: идентификатор, обработка ошибок и метрики
+app.add_middleware(RequestContextMiddleware)
 
 
 # Обработчики исключений
-@app.exception_handler(Exception)
-async def generic_exception_handler(request: Request, exc: Exception):
-    logger.error(f"{request.url} | Error in application: {exc}")
-    return JSONResponse(
-        status_code=500,
-        content={"message": "Internal server error"}
-    )
-
-
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    logger.error(f"{request.url} | HTTP Exception: {exc.detail}")
-    return JSONResponse(
+    logger.error("%s | HTTP Exception: %s", request.url, exc.detail)
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"message": exc.detail}
     )
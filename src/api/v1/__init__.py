@@ -1,6 +1,12 @@
 from fastapi import APIRouter
 from .submit import submit_router
+from .metrics import metrics_router
+from .moderation import moderation_router
+from .events import events_router
 
 api_router = APIRouter()
 
 api_router.include_router(submit_router)
+api_router.include_router(moderation_router)
+api_router.include_router(events_router)
+api_router.include_router(metrics_router)
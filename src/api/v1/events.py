@@ -0,0 +1,26 @@
+import logging
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+
+from src.services.event_feed import pereval_feed
+
+events_router = APIRouter(prefix="/events", tags=["events"])
+logger = logging.getLogger("my_app")
+
+
+@events_router.get("/perevals", response_class=StreamingResponse, name="Лента изменений перевалов")
+async def pereval_events(last_event_id: Annotated[Optional[str], Header()] = None):
+    """Server-Sent Events: created, updated и status с ID перевала вместо повторной загрузки списка.
+
+    После переподключения браузер передает Last-Event-ID, и пропущенные события отправляются из журнала.
+    Событие reset означает, что часть событий недоступна: клиент заново загружает перевалы.
+    """
+    logger.info("Подписка на ленту изменений перевалов, Last-Event-ID: %s", last_event_id)
+
+    return StreamingResponse(
+        pereval_feed.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,53 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core.logger import logging_stats
+from src.core.metrics import registry, collect_snapshots, merge_snapshots, render_prometheus
+from src.services.db_service import pereval_cache
+from src.services.user_service import user_cache
+
+metrics_router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+cache_requests = registry.counter("cache_requests_total", "Обращения к кэшу", ("cache", "result"))
+cache_evictions = registry.counter("cache_evictions_total", "Вытеснения и истечения записей кэша", ("cache",))
+cache_size = registry.gauge("cache_size", "Число записей в кэше", ("cache",))
+log_records = registry.counter("log_records_total", "Записи, переданные в очередь логирования", ("result",))
+log_queue_size = registry.gauge("log_queue_size", "Записи, ожидающие в очереди логирования")
+
+
+def collect_cache_and_logging_stats():
+    for name, cache in (("pereval", pereval_cache), ("user", user_cache)):
+        stats = cache.stats()
+        cache_requests.set_total(stats["hits"], cache=name, result="hit")
+        cache_requests.set_total(stats["misses"], cache=name, result="miss")
+        cache_evictions.set_total(stats["evictions"] + stats["expirations"], cache=name)
+        cache_size.set(stats["size"], cache=name)
+
+    stats = logging_stats()
+    log_records.set_total(stats["enqueued"], result="enqueued")
+    log_records.set_total(stats["dropped"], result="dropped")
+    log_queue_size.set(stats["queue_size"])
+
+
+registry.add_collector(collect_cache_and_logging_stats)
+
+
+@metrics_router.get("", response_class=PlainTextResponse, name="Метрики в формате Prometheus")
+async def get_metrics():
+    """Метрики всех воркеров: запросы по маршрутам, SQL-запросы, пул соединений, кэши и логирование."""
+    return PlainTextResponse(
+        render_prometheus(merge_snapshots(await collect_snapshots())),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@metrics_router.get("/cache", name="Статистика кэшей")
+async def get_cache_stats():
+    """Счетчики попаданий, промахов и вытеснений кэша GET /submitData/{pereval_id} и кэша пользователей."""
+    return {"pereval": pereval_cache.stats(), "user": user_cache.stats()}
+
+
+@metrics_router.get("/logging", name="Статистика очереди логирования")
+async def get_logging_stats():
+    """Число записей, переданных в очередь логирования и отброшенных при ее переполнении."""
+    return logging_stats()
@@ -0,0 +1,40 @@
+import logging
+from typing import Annotated, List
+
+from fastapi import APIRouter, Body
+
+from src.core.config import settings
+from src.db.db import db_dependency
+from src.schemas.submit import ModerationClaimResponse, ModerationReleaseResponse
+from src.services.moderation_service import ModerationService
+
+moderation_router = APIRouter(prefix="/moderation", tags=["moderation"])
+logger = logging.getLogger("my_app")
+
+Moderator = Annotated[str, Body(min_length=1, max_length=100)]
+
+
+@moderation_router.post("/claim", response_model=ModerationClaimResponse, name="Забрать перевалы на модерацию")
+async def claim_perevals(
+    moderator: Moderator,
+    db: db_dependency,
+    limit: Annotated[int, Body(ge=1, le=settings.moderation_claim_max)] = 10,
+):
+    """Выдача самых старых новых перевалов модератору; до истечения срока они в статусе pending."""
+    logger.info("Модератор %s запрашивает перевалы: %s шт.", moderator, limit)
+
+    service = ModerationService(db)
+    return await service.claim(moderator, limit)
+
+
+@moderation_router.post("/release", response_model=ModerationReleaseResponse, name="Вернуть перевалы в очередь")
+async def release_perevals(
+    moderator: Moderator,
+    ids: Annotated[List[int], Body(min_length=1, max_length=settings.moderation_claim_max)],
+    db: db_dependency,
+):
+    """Возврат непроверенных перевалов в очередь до истечения срока."""
+    logger.info("Модератор %s возвращает перевалы: %s шт.", moderator, len(ids))
+
+    service = ModerationService(db)
+    return await service.release(moderator, ids)
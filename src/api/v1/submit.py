@@ -1,13 +1,21 @@
 import logging
-from typing import Union, List
+from datetime import datetime
+from typing import Union, List, Optional, Annotated
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response, Body
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.conditional import pereval_etag, perevals_list_etag, validator_headers, is_conditional, is_not_modified, \
+    if_match_versions
+from src.core.config import settings
+from src.core.serialization import dump_json, model_response
 from src.models.pereval import Status
-from src.db.db import db_dependency
-from src.schemas.submit import SubmitDataRequest, SubmitDataResponse, SimpleResponse, SubmitDataUpdateRequest
+from src.db.db import db_dependency, read_db_dependency, async_session, async_session_replica, reads_from_primary
+from src.schemas.submit import SubmitDataRequest, SubmitDataResponse, SimpleResponse, SubmitDataUpdateRequest, BatchSubmitResult, \
+    NearbyPerevalResponse, UpdatePerevalResponse, BulkStatusItem
 from src.services.db_service import SubmitService
-from src.services.user_service import get_or_create_user
+from src.services.read_service import PerevalReader
 
 submit_router = APIRouter(prefix="/submit", tags=["submit"])
 logger = logging.getLogger("my_app")
@@ -15,7 +23,7 @@ logger = logging.getLogger("my_app")
 
 @submit_router.post("/submitData", response_model=Union[SubmitDataResponse, SimpleResponse], name="Создать перевал")
 async def create_pereval(data: SubmitDataRequest, db: db_dependency):
-    logger.info(f"Создание перевала для пользователя с email: {data.user.email}")
+    logger.info("Создание перевала для пользователя с email: %s", data.user.email)
 
     if not data:
         logger.error("Получены пустые данные")
@@ -24,47 +32,185 @@ async def create_pereval(data: SubmitDataRequest, db: db_dependency):
         logger.error("Данные пользователя отсутствуют")
         raise HTTPException(status_code=400, detail="Ошибка: Данные пользователя не были переданы")
 
-    user = await get_or_create_user(db, data.user)
     service = SubmitService(db)
-    return await service.create_pereval(data, user)
+    return await service.create_pereval(data)
+
+
+@submit_router.post("/submitData/batch", response_model=List[BatchSubmitResult], name="Создать перевалы пакетом")
+async def create_perevals_batch(
+    data: Annotated[List[SubmitDataRequest], Body(min_length=1, max_length=settings.batch_max_items)],
+    db: db_dependency
+):
+    """Пакетное создание перевалов с результатом по каждому элементу."""
+    logger.info("Пакетное создание перевалов: %s шт.", len(data))
+
+    service = SubmitService(db)
+    return await service.create_perevals_batch(data)
 
 
 @submit_router.get("/submitData/", response_model=List[SubmitDataResponse], name="Получить все перевалы")
-async def get_all_perevals(db: db_dependency):
-    """Получение всех перевалов."""
+async def get_all_perevals(
+    db: read_db_dependency,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    cursor: Optional[str] = None,
+    status: Optional[Status] = None,
+    add_time_from: Optional[datetime] = None,
+    add_time_to: Optional[datetime] = None,
+):
+    """Получение перевалов постранично, от новых к старым.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
     logger.info("Получение всех перевалов")
 
+    if "get_all_perevals" in settings.fast_read_endpoints:
+        reader = PerevalReader(db)
+        perevals, next_cursor = await reader.get_all_perevals(limit, cursor, status, add_time_from, add_time_to)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return Response(content=dump_json(perevals), media_type="application/json", headers=headers)
+
     service = SubmitService(db)
-    return await service.get_all_perevals()
+    perevals, next_cursor = await service.get_all_perevals(limit, cursor, status, add_time_from, add_time_to)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return model_response(List[SubmitDataResponse], perevals, headers)
+
+
+@submit_router.get("/submitData/export", name="Выгрузить все перевалы в формате NDJSON")
+async def export_perevals():
+    """Потоковая выгрузка всех перевалов, по одному JSON-объекту на строку."""
+    logger.info("Потоковая выгрузка всех перевалов")
+
+    # Сессия открывается внутри генератора: зависимости с yield закрываются до отправки тела ответа
+    async def generate():
+        async with async_session_replica() as db:
+            reader = PerevalReader(db)
+            async for chunk in reader.export_perevals():
+                yield chunk
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@submit_router.get("/submitData/nearby", response_model=List[NearbyPerevalResponse], name="Найти перевалы поблизости")
+async def get_nearby_perevals(
+    db: read_db_dependency,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=settings.nearby_max_radius_km),
+    limit: int = Query(50, ge=1, le=settings.page_size_max),
+):
+    """Перевалы в радиусе radius_km от точки, отсортированные по расстоянию."""
+    logger.info("Поиск перевалов в радиусе %s км от (%s, %s)", radius_km, lat, lon)
+
+    reader = PerevalReader(db)
+    perevals = await reader.get_nearby_perevals(lat, lon, radius_km, limit)
+    return Response(content=dump_json(perevals), media_type="application/json")
 
 
 @submit_router.get("/submitData/by_user/", response_model=List[SubmitDataResponse], name="Получить перевалы по email пользователя")
-async def get_perevals_by_user_email(user__email: str, db: db_dependency):
-    logger.info(f"Получение всех перевалов для пользователя с email: {user__email}")
+async def get_perevals_by_user_email(user__email: str, request: Request, db: read_db_dependency):
+    logger.info("Получение всех перевалов для пользователя с email: %s", user__email)
     service = SubmitService(db)
-    return await service.get_perevals_by_user_email(user__email)
+
+    # Для условного запроса сначала сверяем версию списка, не загружая сами перевалы
+    if is_conditional(request):
+        count, last_updated_at = await service.get_perevals_by_user_email_version(user__email)
+        etag = perevals_list_etag(count, last_updated_at)
+        if is_not_modified(request, etag, last_updated_at):
+            return Response(status_code=304, headers=validator_headers(etag, last_updated_at))
+
+    if "get_perevals_by_user_email" in settings.fast_read_endpoints:
+        reader = PerevalReader(db)
+        perevals = await reader.get_perevals_by_user_email(user__email)
+        last_updated_at = max((pereval["updated_at"] for pereval in perevals if pereval["updated_at"]), default=None)
+        headers = validator_headers(perevals_list_etag(len(perevals), last_updated_at), last_updated_at)
+        return Response(content=dump_json(perevals), media_type="application/json", headers=headers)
+
+    perevals = await service.get_perevals_by_user_email(user__email)
+    last_updated_at = max((pereval.updated_at for pereval in perevals if pereval.updated_at), default=None)
+    headers = validator_headers(perevals_list_etag(len(perevals), last_updated_at), last_updated_at)
+    return model_response(List[SubmitDataResponse], perevals, headers)
 
 
 @submit_router.get("/submitData/{pereval_id}", response_model=SubmitDataResponse, name="Получить перевал по ID")
-async def get_pereval(pereval_id: int, db: db_dependency):
-    logger.info(f"Получение перевала с ID: {pereval_id}")
+async def get_pereval(pereval_id: int, request: Request, db: read_db_dependency):
+    logger.info("Получение перевала с ID: %s", pereval_id)
+
+    from_primary = reads_from_primary(request)
+    try:
+        return await _read_pereval(pereval_id, request, db, fill_cache=from_primary)
+    except HTTPException as e:
+        if e.status_code != 404 or from_primary:
+            raise
+
+    # Реплика могла еще не получить только что созданный перевал: ссылку открыл не автор
+    # или клиент без cookie read-your-writes, поэтому чтение повторяется в основной БД
+    logger.info("Перевал с ID %s не найден в реплике, чтение из основной БД", pereval_id)
+    async with async_session() as primary_db:
+        return await _read_pereval(pereval_id, request, primary_db, fill_cache=True)
+
+
+async def _read_pereval(pereval_id: int, request: Request, db: AsyncSession, fill_cache: bool) -> Response:
+    service = SubmitService(db)
+
+    # Для условного запроса сначала сверяем версию перевала, не загружая связанные данные
+    if is_conditional(request):
+        version, updated_at = await service.get_pereval_version(pereval_id)
+        etag = pereval_etag(pereval_id, version)
+        if is_not_modified(request, etag, updated_at):
+            return Response(status_code=304, headers=validator_headers(etag, updated_at))
+
+    if settings.pereval_cache_enabled:
+        body, version, updated_at = await service.get_pereval_json(pereval_id, fill_cache=fill_cache)
+        headers = validator_headers(pereval_etag(pereval_id, version), updated_at)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    if "get_pereval" in settings.fast_read_endpoints:
+        reader = PerevalReader(db)
+        pereval = await reader.get_pereval(pereval_id)
+        headers = validator_headers(pereval_etag(pereval_id, pereval["version"]), pereval["updated_at"])
+        return Response(content=dump_json(pereval), media_type="application/json", headers=headers)
+
+    pereval = await service.get_pereval(pereval_id)
+    headers = validator_headers(pereval_etag(pereval_id, pereval.version), pereval.updated_at)
+    return model_response(SubmitDataResponse, pereval, headers)
+
+
+# Объявлен до /submitData/{pereval_id}, иначе путь совпадет с ним
+@submit_router.patch("/submitData/update-status", response_model=List[BulkStatusItem], name="Обновить статус перевалов списком")
+async def update_perevals_status(
+    ids: Annotated[List[int], Body(min_length=1, max_length=settings.batch_max_items)],
+    status: Annotated[Status, Body()],
+    db: db_dependency
+):
+    """Массовая модерация: статус меняется одним запросом, результат возвращается по каждому ID."""
+    logger.info("Массовое обновление статуса на %s: %s шт.", status, len(ids))
 
     service = SubmitService(db)
-    return await service.get_pereval(pereval_id)
+    return await service.update_perevals_status(ids, status)
 
 
-@submit_router.patch("/submitData/{pereval_id}", response_model=SimpleResponse, name="Обновить запись перевала")
-async def patch_submit_data(pereval_id: int, data: SubmitDataUpdateRequest, db: db_dependency):
-    logger.info(f"Обновление записи перевала с ID: {pereval_id}")
+@submit_router.patch("/submitData/{pereval_id}", response_model=UpdatePerevalResponse, name="Обновить запись перевала")
+async def patch_submit_data(
+    pereval_id: int, data: SubmitDataUpdateRequest, request: Request, response: Response, db: db_dependency
+):
+    """Частичное обновление перевала. С заголовком If-Match (ETag перевала) изменение выполняется,
+    только если перевал не менялся с момента чтения, иначе - 409.
+    """
+    logger.info("Обновление записи перевала с ID: %s", pereval_id)
 
     service = SubmitService(db)
-    response = await service.update_pereval(pereval_id, data)
-    return response
+    result = await service.update_pereval(pereval_id, data, if_match_versions(request, pereval_id))
+    if getattr(result, "version", None):
+        response.headers["ETag"] = pereval_etag(pereval_id, result.version)
+    return result
 
 
 @submit_router.patch("/submitData/update-status/{pereval_id}", name="Обновить статус перевала")
-async def update_pereval_status(pereval_id: int, status: Status, db: db_dependency):
-    logger.info(f"Обновление статуса перевала с ID: {pereval_id} на {status}")
+async def update_pereval_status(pereval_id: int, status: Status, request: Request, response: Response, db: db_dependency):
+    """Смена статуса перевала; If-Match - как при обновлении записи."""
+    logger.info("Обновление статуса перевала с ID: %s на %s", pereval_id, status)
 
     service = SubmitService(db)
-    return await service.update_pereval_status(pereval_id, status)
+    result = await service.update_pereval_status(pereval_id, status, if_match_versions(request, pereval_id))
+    response.headers["ETag"] = pereval_etag(pereval_id, result["version"])
+    return result
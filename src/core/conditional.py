@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, Optional
+
+from fastapi import Request
+
+
+# Условные GET-запросы (ETag / Last-Modified) для ответов с перевалами
+def pereval_etag(pereval_id: int, version: int) -> str:
+    return f'"{pereval_id}-{version}"'
+
+
+def perevals_list_etag(count: int, last_updated_at: Optional[datetime]) -> str:
+    # Перевалы не удаляются, поэтому число записей и время последнего изменения однозначно задают версию списка
+    version = last_updated_at.timestamp() if last_updated_at else 0
+    return f'"{count}-{version:.6f}"'
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Проверка If-None-Match, а при его отсутствии - If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Слабое сравнение: префикс W/ не учитывается
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Last-Modified передается с точностью до секунды
+        return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+
+    return False
+
+
+def if_match_versions(request: Request, pereval_id: int) -> Optional[List[int]]:
+    """Версии перевала из If-Match для условного изменения.
+
+    None - заголовка нет или он равен "*" (версия не проверяется). Пустой список - ни один ETag
+    не относится к этому перевалу, изменение завершится конфликтом.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    versions = []
+    for tag in if_match.split(","):
+        # Сильное сравнение: слабые ETag (W/) не подходят
+        tag_id, _, version = tag.strip().removeprefix('"').removesuffix('"').partition("-")
+        if tag_id == str(pereval_id) and version.isdigit():
+            versions.append(int(version))
+    return versions
@@ -1,4 +1,6 @@
 import multiprocessing
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn
 
@@ -13,6 +15,98 @@ class AppSettings(BaseSettings):
     jwt_secret: str = "your_super_secret"
     algorithm: str = "HS256"
 
+    # Пагинация списка перевалов
+    page_size_default: int = 100
+    page_size_max: int = 1000
+
+    # Эндпоинты чтения, обслуживаемые без ORM (get_pereval, get_all_perevals, get_perevals_by_user_email)
+    fast_read_endpoints: List[str] = []
+
+    # Максимальный радиус поиска перевалов поблизости, км
+    nearby_max_radius_km: float = 500.0
+
+    # Размер пачки строк серверного курсора при потоковой выгрузке
+    export_batch_size: int = 1000
+
+    # Максимальное число перевалов в одной пакетной отправке
+    batch_max_items: int = 500
+
+    # Очередь модерации: срок, на который модератор забирает перевалы (секунд), и размер одной выдачи
+    moderation_lease_seconds: int = 900
+    moderation_claim_max: int = 50
+
+    # Кэш ответов GET /submitData/{pereval_id}: число записей и время жизни в секундах
+    pereval_cache_enabled: bool = False
+    pereval_cache_size: int = 10000
+    pereval_cache_ttl: float = 60.0
+
+    # Кэш пользователей по email для повторных отправок: число записей и время жизни в секундах
+    user_cache_size: int = 10000
+    user_cache_ttl: float = 3600.0
+
+    # Канал LISTEN/NOTIFY для рассылки изменений перевалов между воркерами
+    pereval_notify_enabled: bool = True
+    pereval_notify_channel: str = "pereval_changes"
+
+    # Лента изменений перевалов (SSE): опрос журнала событий без уведомлений и интервал keepalive
+    # (секунд), число событий, восстанавливаемых по Last-Event-ID, очередь одного подписчика
+    # и срок хранения журнала (часов)
+    pereval_feed_poll_interval: float = 5.0
+    pereval_feed_heartbeat: float = 15.0
+    pereval_feed_replay_max: int = 1000
+    pereval_feed_queue_size: int = 1000
+    pereval_feed_retention_hours: float = 24.0
+
+    # Реплика для чтения (необязательно). Без fstr_db_replica_host все запросы идут в основную БД
+    fstr_db_replica_host: str | None = None
+    fstr_db_replica_port: int | None = None
+
+    # После своей записи клиент читает из основной БД в течение этого окна (секунд),
+    # пока реплика не догонит изменения. Окно передается клиенту в cookie
+    read_your_writes_window: float = 5.0
+    read_your_writes_cookie: str = "fp_primary_until"
+
+    # Пул соединений с БД на один воркер. Если задан db_max_connections (общий бюджет соединений
+    # всех воркеров), незаданные db_pool_size и db_max_overflow выводятся из него
+    db_pool_size: int | None = None
+    db_max_overflow: int | None = None
+    db_max_connections: int | None = None
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # Кэш подготовленных выражений asyncpg; в режиме PgBouncer (pool_mode=transaction) отключается
+    db_statement_cache_size: int = 100
+    db_pgbouncer: bool = False
+
+    # Прямое подключение к PostgreSQL для слушателя LISTEN/NOTIFY (необязательно). PgBouncer
+    # в режиме transaction не доставляет уведомления, поэтому с db_pgbouncer слушатель подключается
+    # только сюда; без fstr_db_listen_host он подключается к fstr_db_host
+    fstr_db_listen_host: str | None = None
+    fstr_db_listen_port: int | None = None
+
+    # Логирование: размер файла до ротации и число архивов, емкость очереди (при переполнении
+    # записи отбрасываются), размер пачки записи в файл и доля пропускаемых записей ниже WARNING
+    # по именам логгеров, например {"my_app.access": 0.1}
+    log_file_max_bytes: int = 10 * 1024 * 1024
+    log_file_backup_count: int = 5
+    log_queue_size: int = 10000
+    log_batch_size: int = 500
+    log_sample_rates: Dict[str, float] = {}
+
+    # Журнал медленных запросов (LOG_DIR/slow_queries.log): порог в миллисекундах и доля
+    # медленных SELECT, для которых дополнительно снимается EXPLAIN (ANALYZE, BUFFERS)
+    slow_query_log_enabled: bool = False
+    slow_query_threshold_ms: float = 200.0
+    slow_query_explain_sample_rate: float = 0.0
+
+    # Метрики: каталог снимков метрик воркеров и период сохранения снимка в секундах.
+    # Снимки каждого запуска сервера лежат в отдельном подкаталоге. По умолчанию каталог общий
+    # во временном каталоге хоста: если на хосте работает несколько экземпляров, metrics_dir
+    # задается каждому экземпляру явно
+    metrics_dir: str | None = None
+    metrics_flush_interval: float = 5.0
+
     # Переменные базы данных из .env
     fstr_db_host: str
     fstr_db_port: int
@@ -25,6 +119,34 @@ class AppSettings(BaseSettings):
     def postgres_dsn(self) -> PostgresDsn:
         return f"postgresql+asyncpg://{self.fstr_db_login}:{self.fstr_db_pass}@{self.fstr_db_host}:{self.fstr_db_port}/{self.fstr_db_name}"
 
+    # DSN реплики для чтения; None, если реплика не настроена
+    @property
+    def replica_dsn(self) -> PostgresDsn | None:
+        if not self.fstr_db_replica_host:
+            return None
+        port = self.fstr_db_replica_port or self.fstr_db_port
+        return f"postgresql+asyncpg://{self.fstr_db_login}:{self.fstr_db_pass}@{self.fstr_db_replica_host}:{port}/{self.fstr_db_name}"
+
+    # Число воркеров uvicorn
+    @property
+    def workers(self) -> int:
+        return self.cpu_count or multiprocessing.cpu_count()
+
+    # DSN для прямого подключения через asyncpg (без SQLAlchemy)
+    @property
+    def asyncpg_dsn(self) -> str:
+        return f"postgresql://{self.fstr_db_login}:{self.fstr_db_pass}@{self.fstr_db_host}:{self.fstr_db_port}/{self.fstr_db_name}"
+
+    # DSN слушателя LISTEN/NOTIFY; None, если включен PgBouncer, а прямое подключение не задано
+    @property
+    def listen_dsn(self) -> str | None:
+        if self.fstr_db_listen_host:
+            port = self.fstr_db_listen_port or self.fstr_db_port
+            return f"postgresql://{self.fstr_db_login}:{self.fstr_db_pass}@{self.fstr_db_listen_host}:{port}/{self.fstr_db_name}"
+        if self.db_pgbouncer:
+            return None
+        return self.asyncpg_dsn
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"  # Убедитесь, что .env загружается с правильной кодировкой
@@ -38,6 +160,6 @@ settings = AppSettings()
 uvicorn_options = {
     "host": settings.app_host,
     "port": settings.app_port,
-    "workers": settings.cpu_count or multiprocessing.cpu_count(),
+    "workers": settings.workers,
     "reload": settings.reload
 }
\ No newline at end of file
@@ -0,0 +1,41 @@
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+# ASGI scope текущего HTTP-запроса; маршрут (scope["route"]) появляется в нем после сопоставления пути
+request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+
+# Идентификатор текущего HTTP-запроса (заголовок X-Request-ID)
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Метод сервиса, который выполняется в текущем контексте, например "SubmitService.get_all_perevals"
+service_method: ContextVar[Optional[str]] = ContextVar("service_method", default=None)
+
+
+def current_route() -> Optional[str]:
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path")
+
+
+def traced_service(cls):
+    """Декоратор класса сервиса: публичные корутины класса записывают свое имя в service_method."""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+
+        def wrap(method, qualified_name):
+            @functools.wraps(method)
+            async def wrapper(*args, **kwargs):
+                token = service_method.set(qualified_name)
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    service_method.reset(token)
+            return wrapper
+
+        setattr(cls, name, wrap(method, f"{cls.__name__}.{name}"))
+    return cls
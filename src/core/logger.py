@@ -1,7 +1,13 @@
+import atexit
 import logging.config
 import logging.handlers
+import queue
+import random
 from pathlib import Path
-from queue import Queue
+from typing import Dict, Optional
+
+from src.core.config import settings
+from src.core.context import request_id
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 
@@ -18,10 +24,20 @@ LOGGING_CONFIG = {
             "datefmt": "%Y-%m-%dT%H:%M:%S%z"
         },
         "detailed": {
-            "format": "[%(levelname)s|%(module)s|L%(lineno)d] %(asctime)s: %(message)s",
+            "format": "[%(levelname)s|%(module)s|L%(lineno)d|%(request_id)s] %(asctime)s: %(message)s",
             "datefmt": "%Y-%m-%dT%H:%M:%S%z"
         }
     },
+    "filters": {
+        "slow_queries": {
+            "name": "my_app.slow_queries"
+        },
+        # Медленные запросы пишутся только в slow_queries.log
+        "exclude_slow_queries": {
+            "()": "src.core.logger.ExcludeLoggerFilter",
+            "name": "my_app.slow_queries"
+        }
+    },
     "handlers": {
         "stderr": {
             "class": "logging.StreamHandler",
@@ -30,17 +46,26 @@ LOGGING_CONFIG = {
             "stream": "ext://sys.stderr"
         },
         "file": {
-            "class": "logging.handlers.RotatingFileHandler",
+            "class": "src.core.logger.BufferedRotatingFileHandler",
             "level": "DEBUG",
             "formatter": "detailed",
+            "filters": ["exclude_slow_queries"],
             "filename": str(LOG_DIR / "my_app.log"),
-            "maxBytes": 10000,
-            "backupCount": 3,
+            "maxBytes": settings.log_file_max_bytes,
+            "backupCount": settings.log_file_backup_count,
+            "encoding": "utf-8",
             "delay": False
         },
-        "queue_handler": {
-            "class": "logging.handlers.QueueHandler",
-            "formatter": "detailed"
+        "slow_queries_file": {
+            "class": "src.core.logger.BufferedRotatingFileHandler",
+            "level": "INFO",
+            "formatter": "detailed",
+            "filters": ["slow_queries"],
+            "filename": str(LOG_DIR / "slow_queries.log"),
+            "maxBytes": settings.log_file_max_bytes,
+            "backupCount": settings.log_file_backup_count,
+            "encoding": "utf-8",
+            "delay": True
         }
     },
     "loggers": {
@@ -48,34 +73,170 @@ LOGGING_CONFIG = {
             "level": "DEBUG",
             "handlers": [
                 "stderr",
-                "file"
+                "file",
+                "slow_queries_file"
             ]
         }
     }
 }
 
 
-class CustomRotatingFileHandler(logging.handlers.RotatingFileHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Ротация по размеру без сброса на диск после каждой записи.
+
+    Буфер сбрасывается слушателем очереди один раз на пачку записей через flush_buffer().
+    """
+
+    def flush(self):
+        pass
+
+    def flush_buffer(self):
+        super().flush()
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает долю записей уровня ниже WARNING для заданных логгеров (и их потомков).
+
+    rates: имя логгера -> доля пропускаемых записей от 0 до 1.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def _rate(self, name: str) -> Optional[float]:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or random.random() < rate
+
+
+class ExcludeLoggerFilter(logging.Filter):
+    """Отбрасывает записи заданного логгера (и его потомков), пропуская остальные."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not super().filter(record)
+
+
+class RequestIdFilter(logging.Filter):
+    """Добавляет в запись идентификатор текущего HTTP-запроса ("-" вне запроса).
+
+    Работает в вызывающем потоке, пока контекст запроса еще доступен.
+    """
 
-    def rotate(self, source, dest):
-        # Когда происходит ротация, вызываем остановку логирования
-        super().rotate(source, dest)
-        logging.shutdown()
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get() or "-"
+        return True
 
 
-def setup_logging():
-    # Очередь для передачи логов
-    log_queue = Queue(-1)
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Передает записи в ограниченную очередь, не блокируя вызывающий код.
+
+    Если очередь заполнена, запись отбрасывается и учитывается в счетчике dropped.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Сообщение форматируется в потоке слушателя, а не в event loop
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Слушатель очереди, который обрабатывает записи пачками и сбрасывает файлы один раз на пачку."""
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, batch_size: int = 500):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self) -> None:
+        has_task_done = hasattr(self.queue, "task_done")
+        stopping = False
+        while not stopping:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                else:
+                    self.handle(record)
+                if has_task_done:
+                    self.queue.task_done()
+
+            for handler in self.handlers:
+                try:
+                    if isinstance(handler, BufferedRotatingFileHandler):
+                        handler.flush_buffer()
+                    else:
+                        handler.flush()
+                except (OSError, ValueError):
+                    # Поток закрыт или недоступен: ошибка одного обработчика не останавливает слушателя
+                    pass
+
+    def enqueue_sentinel(self) -> None:
+        # Очередь может быть заполнена: ждем, пока слушатель освободит место
+        self.queue.put(self._sentinel)
+
+
+queue_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[BatchingQueueListener] = None
+
+
+def setup_logging() -> None:
+    """Единый конвейер логирования процесса: корневой логгер пишет только в ограниченную очередь,
+    а обработчики stderr и файла работают в потоке слушателя. Повторный вызов ничего не делает.
+    """
+    global queue_handler, _listener
+    if _listener is not None:
+        return
 
-    # Настраиваем конфигурацию логгирования
     logging.config.dictConfig(LOGGING_CONFIG)
 
-    # Создаем и запускаем слушателя для логов
-    queue_handler = logging.handlers.QueueHandler(log_queue)
-    listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers)
-    listener.start()
+    # Обработчики из конфигурации переходят к слушателю очереди
+    root_logger = logging.getLogger()
+    handlers = list(root_logger.handlers)
+    for handler in handlers:
+        root_logger.removeHandler(handler)
 
-    # Добавляем QueueHandler в логгер
-    logging.getLogger().addHandler(queue_handler)
+    log_queue = queue.Queue(settings.log_queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    if settings.log_sample_rates:
+        queue_handler.addFilter(SamplingFilter(settings.log_sample_rates))
+    root_logger.addHandler(queue_handler)
+
+    _listener = BatchingQueueListener(log_queue, *handlers, batch_size=settings.log_batch_size)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def logging_stats() -> Dict[str, int]:
+    if queue_handler is None:
+        return {"enqueued": 0, "dropped": 0, "queue_size": 0}
+    return {
+        "enqueued": queue_handler.enqueued,
+        "dropped": queue_handler.dropped,
+        "queue_size": queue_handler.queue.qsize(),
+    }
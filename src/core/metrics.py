@@ -0,0 +1,353 @@
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.core.config import settings
+
+logger = logging.getLogger("my_app")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(key), value] for key, value in self._samples()],
+        }
+
+    def _samples(self) -> Iterable[Tuple[LabelValues, Any]]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, value: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+    def set_total(self, value: float, **labels) -> None:
+        """Значение счетчика, который ведется вне реестра (например, счетчики кэша)."""
+        self._values[self._key(labels)] = value
+
+    def _samples(self):
+        return list(self._values.items())
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def _samples(self):
+        return list(self._values.items())
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Для каждого набора меток: число наблюдений по корзинам (не накопленное), сумма и количество
+        self._values: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[0][index] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+    def _samples(self):
+        return [(key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items()]
+
+
+class Registry:
+    """Метрики воркера и функции, обновляющие значения, которые снимаются с других объектов."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error("Ошибка сбора метрик: %s", e)
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "Число HTTP-запросов", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Длительность обработки HTTP-запроса", ("method", "route")
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries", "Число SQL-запросов на один HTTP-запрос", ("route",), QUERY_COUNT_BUCKETS
+)
+http_request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds", "Суммарное время SQL-запросов на один HTTP-запрос", ("route",)
+)
+db_queries = registry.counter("db_queries_total", "Число SQL-запросов", ("engine",))
+db_query_duration = registry.histogram("db_query_duration_seconds", "Длительность SQL-запроса", ("engine",))
+db_pool_checkout_duration = registry.histogram(
+    "db_pool_checkout_seconds", "Ожидание соединения из пула", ("engine",)
+)
+db_pool_size = registry.gauge("db_pool_size", "Размер пула соединений", ("engine",))
+db_pool_connections = registry.gauge("db_pool_connections", "Соединения пула по состоянию", ("engine", "state"))
+
+
+# SQL-запросы текущего HTTP-запроса: [число, суммарное время]
+request_db_stats: ContextVar[Optional[List[float]]] = ContextVar("request_db_stats", default=None)
+
+
+def record_query(engine_name: str, duration: float) -> None:
+    db_queries.inc(engine=engine_name)
+    db_query_duration.observe(duration, engine=engine_name)
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += duration
+
+
+def record_request(method: str, route: str, status: int, duration: float, stats: List[float]) -> None:
+    """Метрики завершенного HTTP-запроса; stats - значение request_db_stats этого запроса."""
+    http_requests.inc(method=method, route=route, status=status)
+    http_request_duration.observe(duration, method=method, route=route)
+    http_request_db_queries.observe(stats[0], route=route)
+    http_request_db_duration.observe(stats[1], route=route)
+
+
+# Агрегация по воркерам: каждый воркер периодически сохраняет снимок своих метрик в каталог
+# текущего запуска сервера, а /metrics объединяет снимки всех воркеров с текущими значениями
+# обслуживающего воркера
+
+def server_pid() -> int:
+    """PID процесса, запустившего сервер: мастер uvicorn для воркеров, иначе сам процесс."""
+    parent = multiprocessing.parent_process()
+    return parent.pid if parent is not None else os.getpid()
+
+
+def metrics_root() -> Path:
+    return Path(settings.metrics_dir) if settings.metrics_dir else Path(tempfile.gettempdir()) / "fastpass_metrics"
+
+
+def metrics_dir() -> Path:
+    """Каталог снимков текущего запуска: снимки других запусков и экземпляров в него не попадают."""
+    return metrics_root() / f"server-{server_pid()}"
+
+
+def prepare_metrics_dir() -> None:
+    """Создание каталога снимков текущего запуска и удаление каталогов завершенных запусков;
+    вызывается в lifespan каждого воркера.
+    """
+    current = metrics_dir()
+    current.mkdir(parents=True, exist_ok=True)
+    for path in metrics_root().iterdir():
+        pid = path.name.removeprefix("server-")
+        if path.is_dir() and path != current and pid.isdigit() and not _is_alive(int(pid)):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# Имя снимка уникально для процесса: воркер, получивший PID завершенного воркера,
+# не перезаписывает его снимок, и объединенные счетчики не уменьшаются
+_snapshot_name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+
+
+def write_snapshot(snapshot: Dict[str, Dict[str, Any]]) -> None:
+    path = metrics_dir() / _snapshot_name
+    tmp_path = path.with_suffix(".tmp")
+    try:
+        tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+    except FileNotFoundError:
+        # Каталог создается при старте; сюда попадаем, только если его удалили во время работы
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+async def collect_snapshots() -> List[Tuple[Dict[str, Any], bool]]:
+    """Снимки всех воркеров: текущий воркер берется из памяти. Второй элемент - жив ли воркер."""
+    # Как и при записи, снимок берется в event loop, а файлы читаются в отдельном потоке
+    snapshot = registry.snapshot()
+    return [(snapshot, True)] + await asyncio.to_thread(read_snapshots)
+
+
+def read_snapshots() -> List[Tuple[Dict[str, Any], bool]]:
+    """Сохраненные снимки других воркеров текущего запуска."""
+    snapshots = []
+    for path in metrics_dir().glob("*.json"):
+        pid = path.stem.partition("-")[0]
+        if not pid.isdigit() or path.name == _snapshot_name:
+            continue
+        try:
+            snapshots.append((json.loads(path.read_text(encoding="utf-8")), _is_alive(int(pid))))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def merge_snapshots(snapshots: List[Tuple[Dict[str, Any], bool]]) -> Dict[str, Dict[str, Any]]:
+    """Сумма счетчиков и гистограмм всех воркеров; показатели (gauge) - только живых."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot, alive in snapshots:
+        for name, metric in snapshot.items():
+            if metric["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if metric["type"] == "histogram":
+                    current = target["samples"].get(key)
+                    if current is None or len(current[0]) != len(value[0]):
+                        target["samples"][key] = [list(value[0]), value[1], value[2]]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], value[0])]
+                        current[1] += value[1]
+                        current[2] += value[2]
+                else:
+                    target["samples"][key] = target["samples"].get(key, 0) + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render_prometheus(merged: Dict[str, Dict[str, Any]]) -> str:
+    """Текстовый формат Prometheus 0.0.4."""
+    lines = []
+    for name, metric in sorted(merged.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric["labelnames"]
+        for key, value in sorted(metric["samples"].items()):
+            if metric["type"] == "histogram":
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(metric["buckets"], counts):
+                    cumulative += bucket_count
+                    le = 'le="%s"' % _number(bound)
+                    lines.append(f"{name}_bucket{_labels(names, key, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{_labels(names, key, le)} {count}")
+                lines.append(f"{name}_sum{_labels(names, key)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(names, key)} {count}")
+            else:
+                lines.append(f"{name}{_labels(names, key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class SnapshotWriter:
+    """Фоновая задача воркера, сохраняющая снимок метрик раз в metrics_flush_interval секунд."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        # Последний снимок: счетчики остановленного воркера продолжают учитываться
+        await asyncio.to_thread(write_snapshot, registry.snapshot())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.metrics_flush_interval)
+            try:
+                # Снимок берется в event loop, файл пишется в отдельном потоке
+                await asyncio.to_thread(write_snapshot, registry.snapshot())
+            except OSError as e:
+                logger.error("Не удалось сохранить снимок метрик: %s", e)
+
+
+snapshot_writer = SnapshotWriter()
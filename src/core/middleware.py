@@ -0,0 +1,77 @@
+import logging
+import re
+import time
+from uuid import uuid4
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+
+from src.core.context import request_id, request_scope
+from src.core.metrics import record_request, request_db_stats
+
+logger = logging.getLogger("my_app")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Входящий идентификатор принимается, только если он короткий и без спецсимволов
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+def _incoming_request_id(scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            value = value.decode("latin-1")
+            return value if _VALID_REQUEST_ID.match(value) else None
+    return None
+
+
+class RequestContextMiddleware:
+    """ASGI-middleware контекста запроса, за один проход:
+
+    - идентификатор запроса (из X-Request-ID или новый) в контексте логов и в заголовке ответа;
+    - ответ JSON 500 на необработанное исключение;
+    - метрики запроса: маршрут, код ответа, длительность и SQL-запросы.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        current_id = _incoming_request_id(scope) or uuid4().hex
+        stats = [0, 0.0]
+        tokens = (request_id.set(current_id), request_scope.set(scope), request_db_stats.set(stats))
+        status = 500
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal status, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status = message["status"]
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, current_id)
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            logger.error("%s %s | Error in application: %s", scope["method"], scope["path"], exc)
+            if response_started:
+                raise
+            status = 500
+            response = JSONResponse(
+                status_code=500,
+                content={"message": "Internal server error"},
+                headers={REQUEST_ID_HEADER: current_id}
+            )
+            await response(scope, receive, send)
+        finally:
+            duration = time.perf_counter() - start
+            for var, token in zip((request_id, request_scope, request_db_stats), tokens):
+                var.reset(token)
+            # Шаблон пути маршрута, а не сам путь, чтобы не плодить метки
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            record_request(scope["method"], route, status, duration, stats)
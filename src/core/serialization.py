@@ -0,0 +1,31 @@
+import functools
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def dump_json(content: Any) -> bytes:
+    """Сериализация словарей и списков ответа в JSON (orjson: datetime в ISO 8601, UTF-8 без экранирования)."""
+    return orjson.dumps(content)
+
+
+@functools.lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    """TypeAdapter типа ответа; схема сериализации строится один раз на тип."""
+    return TypeAdapter(response_type)
+
+
+def dump_model(response_type: Any, content: Any) -> bytes:
+    """Сериализация уже проверенных моделей pydantic сразу в байты JSON."""
+    return type_adapter(response_type).dump_json(content)
+
+
+def model_response(response_type: Any, content: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Готовый ответ из моделей, созданных сервисом.
+
+    FastAPI не проверяет повторно возвращенный Response по response_model, поэтому модели
+    валидируются один раз - при создании в сервисе. response_model маршрута остается для OpenAPI.
+    """
+    return Response(content=dump_model(response_type, content), media_type="application/json", headers=headers)
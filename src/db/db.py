@@ -1,16 +1,34 @@
-from fastapi import Depends
-from sqlalchemy import NullPool
+import math
+import time
+from uuid import uuid4
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import NullPool, event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (async_sessionmaker, create_async_engine, AsyncSession, AsyncEngine, AsyncConnection)
 from src.core.config import settings
-from typing import Union, Callable, Annotated
+from src.core.metrics import registry, record_query, db_pool_checkout_duration, db_pool_size, db_pool_connections
+from src.db.slow_queries import record_slow_query
+from typing import Any, Dict, Union, Callable, Annotated
 
 
 class InternalError(Exception):
     pass
 
 
-# Функция для получения асинхронной сессии
-async def get_async_session() -> AsyncSession:
+# Функция для получения асинхронной сессии основной БД.
+# Сессия основной БД нужна для записи, поэтому клиенту выставляется cookie read-your-writes
+async def get_async_session(response: Response) -> AsyncSession:
+    if engine_replica is not engine:
+        window = settings.read_your_writes_window
+        response.set_cookie(
+            settings.read_your_writes_cookie,
+            f"{time.time() + window:.3f}",
+            max_age=math.ceil(window),
+            httponly=True,
+            samesite="lax"
+        )
+
     async with async_session() as session:
         try:
             yield session
@@ -18,6 +36,26 @@ async def get_async_session() -> AsyncSession:
             await session.rollback()
 
 
+# Читать из основной БД: реплики нет или клиент недавно сам записывал данные
+def reads_from_primary(request: Request) -> bool:
+    if engine_replica is engine:
+        return True
+    try:
+        return float(request.cookies.get(settings.read_your_writes_cookie)) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+# Функция для получения асинхронной сессии для чтения (реплика либо основная БД)
+async def get_async_read_session(request: Request) -> AsyncSession:
+    sessionmaker = async_session if reads_from_primary(request) else async_session_replica
+    async with sessionmaker() as session:
+        try:
+            yield session
+        except InternalError:
+            await session.rollback()
+
+
 # Функция для создания фабрики сессий
 def create_sessionmaker(
     bind_engine: Union[AsyncEngine, AsyncConnection]
@@ -29,13 +67,106 @@ def create_sessionmaker(
     )
 
 
+# Параметры подключения asyncpg
+def connect_args() -> Dict[str, Any]:
+    if settings.db_pgbouncer:
+        # PgBouncer в режиме transaction не сохраняет подготовленные выражения между транзакциями:
+        # кэши выключены, а каждое выражение получает уникальное имя
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {"statement_cache_size": settings.db_statement_cache_size}
+
+
+# Параметры пула соединений одного воркера
+def pool_options() -> Dict[str, Any]:
+    pool_size, max_overflow = settings.db_pool_size, settings.db_max_overflow
+
+    if settings.db_max_connections:
+        # Бюджет делится между воркерами; одно соединение воркера занимает слушатель LISTEN/NOTIFY
+        per_worker = settings.db_max_connections // settings.workers
+        if settings.pereval_notify_enabled:
+            per_worker -= 1
+        per_worker = max(per_worker, 1)
+
+        pool_size = min(pool_size or per_worker, per_worker)
+        max_overflow = min(per_worker - pool_size, max_overflow if max_overflow is not None else per_worker)
+
+    return {
+        "pool_size": pool_size if pool_size is not None else 5,
+        "max_overflow": max_overflow if max_overflow is not None else 10,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+# Пул, замеряющий ожидание свободного соединения. Имя движка берется из pool_logging_name
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_duration.observe(time.perf_counter() - start, engine=self.logging_name)
+
+
+def create_engine(dsn: str, name: str) -> AsyncEngine:
+    return create_async_engine(
+        dsn,
+        connect_args=connect_args(),
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_logging_name=name,
+        **pool_options()
+    )
+
+
+# Число и длительность SQL-запросов движка
+def instrument_engine(async_engine: AsyncEngine, name: str) -> None:
+    # Время начала хранится в контексте выполнения: если запрос завершился ошибкой,
+    # after_cursor_execute не вызывается, и значение уходит вместе с контекстом
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.query_start_time = time.perf_counter()
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "query_start_time", None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        record_query(name, duration)
+        record_slow_query(conn, statement, parameters, context, executemany, duration)
+
+    def collect_pool_stats():
+        pool = async_engine.pool
+        db_pool_size.set(pool.size(), engine=name)
+        db_pool_connections.set(pool.checkedout(), engine=name, state="checked_out")
+        db_pool_connections.set(pool.checkedin(), engine=name, state="checked_in")
+        db_pool_connections.set(max(pool.overflow(), 0), engine=name, state="overflow")
+
+    registry.add_collector(collect_pool_stats)
+
+
 # Создание асинхронного движка для подключения к PostgreSQL
-engine = create_async_engine(settings.postgres_dsn)
-engine_null_pool = create_async_engine(settings.postgres_dsn, poolclass=NullPool)
+engine = create_engine(settings.postgres_dsn, "primary")
+engine_null_pool = create_async_engine(settings.postgres_dsn, connect_args=connect_args(), poolclass=NullPool)
+
+# Движок реплики для чтения; без реплики чтение идет через основной движок
+engine_replica = create_engine(settings.replica_dsn, "replica") if settings.replica_dsn else engine
+
+instrument_engine(engine, "primary")
+if engine_replica is not engine:
+    instrument_engine(engine_replica, "replica")
 
 # Создание фабрики сессий
 async_session = create_sessionmaker(engine)
+async_session_replica = create_sessionmaker(engine_replica)
 async_session_null_pool = async_sessionmaker(bind=engine_null_pool)
 
-# Создание зависимости для работы с базой данных
+# Создание зависимостей для работы с базой данных: запись и чтение
 db_dependency = Annotated[AsyncSession, Depends(get_async_session)]
+read_db_dependency = Annotated[AsyncSession, Depends(get_async_read_session)]
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+from typing import Callable, List, Optional
+
+import asyncpg
+from sqlalchemy import select, func, literal, Integer, ColumnElement
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+
+logger = logging.getLogger("my_app")
+
+# Обработчик события: тип события и ID перевала (None — события могли быть потеряны, сбросить все)
+ChangeCallback = Callable[[str, Optional[int]], None]
+
+
+def pereval_notify_expression(pereval_id, event: str) -> ColumnElement:
+    """Выражение для встраивания в запрос: событие записывается в журнал pereval_events
+    и рассылается через pg_notify; уведомление уходит после COMMIT.
+    """
+    return func.record_pereval_event(settings.pereval_notify_channel, event, pereval_id)
+
+
+async def notify_perevals_changed(db: AsyncSession, pereval_ids: List[int], event: str) -> None:
+    """Одно уведомление на каждый перевал из списка, одним запросом."""
+    if not pereval_ids:
+        return
+    ids = func.unnest(literal(pereval_ids, ARRAY(Integer))).table_valued("id").render_derived()
+    await db.execute(select(pereval_notify_expression(ids.c.id, event)).select_from(ids))
+
+
+class PerevalChangeListener:
+    """Слушатель канала изменений перевалов на отдельном соединении asyncpg.
+
+    Запускается в lifespan каждого воркера и передает события зарегистрированным обработчикам.
+    После разрыва соединения переподключается и рассылает событие "reset", так как
+    уведомления за время разрыва потеряны. Без dsn (PgBouncer без прямого подключения) не запускается.
+    """
+
+    def __init__(self, dsn: Optional[str], channel: str):
+        self._dsn = dsn
+        self._channel = channel
+        self._callbacks: List[ChangeCallback] = []
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def register(self, callback: ChangeCallback) -> None:
+        self._callbacks.append(callback)
+
+    async def start(self) -> None:
+        if self._dsn is None:
+            logger.warning(
+                "Подписка на канал %s отключена: через PgBouncer уведомления не доставляются, а "
+                "FSTR_DB_LISTEN_HOST не задан. Кэш других воркеров сбрасывается только по сроку жизни, "
+                "лента изменений обновляется только опросом журнала", self._channel
+            )
+            return
+        self._closing = False
+        try:
+            await self._connect()
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.error("Не удалось подписаться на канал %s: %s", self._channel, e)
+            self._schedule_reconnect()
+
+    async def stop(self) -> None:
+        self._closing = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    async def _connect(self) -> None:
+        self._connection = await asyncpg.connect(self._dsn)
+        self._connection.add_termination_listener(self._on_termination)
+        await self._connection.add_listener(self._channel, self._on_notification)
+        logger.info("Подписка на канал %s установлена", self._channel)
+
+    def _schedule_reconnect(self) -> None:
+        if not self._closing and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1
+        while not self._closing:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.error("Повторная подписка на канал %s не удалась: %s", self._channel, e)
+                delay = min(delay * 2, 30)
+                continue
+            self._dispatch("reset", None)
+            return
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        if not self._closing:
+            logger.error("Соединение слушателя канала %s разорвано", self._channel)
+            self._schedule_reconnect()
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            event, pereval_id = message["event"], int(message["id"])
+        except (ValueError, KeyError, TypeError):
+            logger.error("Некорректное уведомление в канале %s: %s", channel, payload)
+            return
+        self._dispatch(event, pereval_id)
+
+    def _dispatch(self, event: str, pereval_id: Optional[int]) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(event, pereval_id)
+            except Exception as e:
+                logger.error("Ошибка обработчика события %s для перевала %s: %s", event, pereval_id, e)
+
+
+# Общий слушатель воркера; обработчики регистрируются модулями, которым нужны события
+pereval_listener = PerevalChangeListener(settings.listen_dsn, settings.pereval_notify_channel)
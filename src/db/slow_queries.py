@@ -0,0 +1,87 @@
+import logging
+import random
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from src.core.config import settings
+from src.core.context import current_route, service_method
+
+# Записи уходят в отдельный файл LOG_DIR/slow_queries.log (см. LOGGING_CONFIG)
+slow_query_logger = logging.getLogger("my_app.slow_queries")
+
+
+def _redact(value: Any) -> Any:
+    # Числа, даты и флаги оставляем как есть; строки (email, ФИО, телефоны) и коллекции - только тип и длина
+    if value is None or isinstance(value, (bool, int, float, Decimal, datetime, date)):
+        return value
+    if isinstance(value, (str, bytes, list, tuple, dict)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(value) for value in parameters]
+    return _redact(parameters)
+
+
+# Значения параметров подставляются в текст плана как строковые литералы
+_PLAN_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+def _explainable(statement: str, context, executemany: bool) -> bool:
+    """EXPLAIN ANALYZE выполняет запрос повторно, поэтому допускаются только чтения.
+
+    Запросы с серверным курсором пропускаются: соединение занято открытым курсором.
+    """
+    if executemany or context is None:
+        return False
+    options = context.execution_options
+    if options.get("stream_results") or options.get("yield_per"):
+        return False
+    head = statement.lstrip().upper()
+    # record_pereval_event пишет в журнал событий и отправляет уведомление
+    return head.startswith("SELECT") and "RECORD_PEREVAL_EVENT" not in head
+
+
+def explain(conn, statement: str, parameters: Any) -> str:
+    """EXPLAIN (ANALYZE, BUFFERS) на том же соединении внутри точки сохранения, которая затем откатывается."""
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            return _PLAN_LITERAL.sub("'<redacted>'", plan)
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+
+
+def record_slow_query(conn, statement: str, parameters: Any, context, executemany: bool, duration: float) -> None:
+    """Запись запроса дольше slow_query_threshold_ms; для доли запросов - с планом выполнения."""
+    if not settings.slow_query_log_enabled or duration * 1000 < settings.slow_query_threshold_ms:
+        return
+
+    plan: Optional[str] = None
+    if random.random() < settings.slow_query_explain_sample_rate and _explainable(statement, context, executemany):
+        try:
+            plan = explain(conn, statement, parameters)
+        except Exception as e:
+            plan = f"EXPLAIN не выполнен: {e}"
+
+    slow_query_logger.info(
+        "Медленный запрос %.1f мс | маршрут: %s | метод: %s\nSQL: %s\nПараметры: %s%s",
+        duration * 1000,
+        current_route() or "-",
+        service_method.get() or "-",
+        statement,
+        redact_parameters(parameters),
+        f"\nПлан:\n{plan}" if plan else ""
+    )
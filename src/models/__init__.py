@@ -1,9 +1,10 @@
 from .base import Base
 from .user import User
-from .coords import Coords
-from .pereval import PerevalAdded, Status
+from .coords import Coords, quantized_coords
+from .pereval import PerevalAdded, Status, normalized_title
 from .images import PerevalImages
 from .level import Level
+from .events import PerevalEvent
 
 __all__ = [
     "Base",
@@ -12,5 +13,8 @@ __all__ = [
     "PerevalAdded",
     "PerevalImages",
     "Status",
-    "Level"
+    "Level",
+    "PerevalEvent",
+    "normalized_title",
+    "quantized_coords"
 ]
@@ -1,14 +1,33 @@
-from sqlalchemy import Column, Integer, Float
+from sqlalchemy import Column, Integer, Float, Index, Numeric, Text, Computed, cast, func, literal_column
 from sqlalchemy.orm import relationship
 from .base import Base
 
 
+# Ключ координат для поиска дубликатов: широта и долгота, округленные до 6 знаков (~0.1 м), и высота.
+# Одно и то же выражение вычисляет колонку coord_key и применяется к параметрам запросов.
+def quantized_coords(latitude, longitude, height):
+    return (
+        cast(func.round(cast(latitude, Numeric), 6), Text) + ","
+        + cast(func.round(cast(longitude, Numeric), 6), Text) + ","
+        + cast(height, Text)
+    )
+
+
 class Coords(Base):
     __tablename__ = "coords"
+    __table_args__ = (
+        # Индекс под поиск перевалов в ограничивающем прямоугольнике
+        Index("ix_coords_latitude_longitude", "latitude", "longitude"),
+        Index("ux_coords_coord_key", "coord_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     height = Column(Integer, nullable=False)
+    coord_key = Column(Text, Computed(
+        quantized_coords(literal_column("latitude"), literal_column("longitude"), literal_column("height")),
+        persisted=True
+    ))
 
     perevals = relationship("PerevalAdded", back_populates="coords")
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index, func
+from .base import Base
+
+
+class PerevalEvent(Base):
+    """Журнал изменений перевалов для ленты событий.
+
+    Строки добавляет функция БД record_pereval_event, которую вызывает pereval_notify_expression.
+    txid - номер транзакции, записавшей событие: лента отдает события в порядке (txid, id).
+    """
+    __tablename__ = "pereval_events"
+    __table_args__ = (
+        Index("ix_pereval_events_txid_id", "txid", "id"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    txid = Column(BigInteger, nullable=False)
+    pereval_id = Column(Integer, nullable=False)
+    event = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
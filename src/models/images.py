@@ -10,5 +10,7 @@ class PerevalImages(Base):
     pereval_id = Column(Integer, ForeignKey("pereval_added.id", ondelete="CASCADE"), nullable=False)
     image_url = Column(String, nullable=False)
     title = Column(String, nullable=False)
+    # Порядок изображения в списке перевала, как его передал клиент
+    position = Column(Integer, nullable=False, default=0, server_default="0")
 
     pereval = relationship("PerevalAdded", back_populates="images")
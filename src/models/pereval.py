@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Index, Computed, func, literal_column, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
@@ -13,8 +13,23 @@ class Status(PyEnum):
     rejected = "rejected"
 
 
+# Ключ названия для поиска дубликатов: без учета регистра и лишних пробелов.
+# Одно и то же выражение вычисляет колонку title_key и применяется к параметрам запросов.
+def normalized_title(title):
+    return func.lower(func.btrim(func.regexp_replace(title, r"\s+", " ", "g")))
+
+
 class PerevalAdded(Base):
     __tablename__ = "pereval_added"
+    __table_args__ = (
+        # Индексы под keyset-пагинацию списка перевалов (сортировка по add_time, id)
+        Index("ix_pereval_added_add_time_id", "add_time", "id"),
+        Index("ix_pereval_added_status_add_time_id", "status", "add_time", "id"),
+        Index("ux_pereval_added_title_key", "title_key", unique=True),
+        # Очередь модерации: новые перевалы в порядке поступления и перевалы с истекающим сроком проверки
+        Index("ix_pereval_added_new_add_time_id", "add_time", "id", postgresql_where=text("status = 'new'")),
+        Index("ix_pereval_added_pending_claim_expires_at", "claim_expires_at", postgresql_where=text("status = 'pending'")),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -22,12 +37,23 @@ class PerevalAdded(Base):
     level_id = Column(Integer, ForeignKey("levels.id"), nullable=True)
     beauty_title = Column(String)
     title = Column(String)
+    title_key = Column(String, Computed(normalized_title(literal_column("title")), persisted=True))
     other_titles = Column(String)
     connect = Column(String)
     add_time = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now)
     status = Column(Enum(Status), default=Status.new)
+    # Версия записи для оптимистичной блокировки: увеличивается при каждом изменении
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Модератор, забравший перевал из очереди, и срок, после которого перевал возвращается в очередь
+    claimed_by = Column(String, nullable=True)
+    claim_expires_at = Column(DateTime, nullable=True)
 
     user = relationship("User", back_populates="perevals")
     coords = relationship("Coords", back_populates="perevals", cascade="all, delete-orphan", single_parent=True)
-    images = relationship("PerevalImages", back_populates="pereval", cascade="all, delete-orphan", single_parent=True)
+    # Порядок изображений - порядок в последнем переданном списке
+    images = relationship(
+        "PerevalImages", back_populates="pereval", cascade="all, delete-orphan", single_parent=True,
+        order_by="[PerevalImages.position, PerevalImages.id]"
+    )
     level = relationship("Level", back_populates="pereval", foreign_keys=[level_id], cascade="all, delete-orphan", single_parent=True)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr, field_validator
+from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -72,23 +72,110 @@ class SubmitDataResponse(BaseModel):
     other_titles: Optional[str] = None
     connect: Optional[str] = None
     add_time: datetime
+    updated_at: Optional[datetime] = None
+    version: int
     user: UserSchema
     coords: CoordsSchema
     level: LevelSchema
     images: List[ImageSchema]
 
 
+class NearbyPerevalResponse(SubmitDataResponse):
+    distance_km: float
+
+
 class SimpleResponse(BaseModel):
     state: int
     message: str
     share_link: str
 
 
-class SubmitDataUpdateRequest(BaseModel):
-    beauty_title: str
-    title: str
-    other_titles: str
-    connect: str
-    coords: CoordsSchema
-    level: LevelSchema
-    images: List[ImageSchema]
+# Изменения изображений при обновлении перевала
+class ImageSyncResult(BaseModel):
+    added: List[ImageSchema] = []
+    removed: List[ImageSchema] = []
+    retitled: List[ImageSchema] = []
+    moved: List[ImageSchema] = []
+
+
+class UpdatePerevalResponse(SimpleResponse):
+    version: Optional[int] = None
+    images: Optional[ImageSyncResult] = None
+
+
+class MergePatchModel(BaseModel):
+    """Тело частичного обновления по правилам JSON Merge Patch (RFC 7396).
+
+    Отсутствующее поле не меняется, поэтому проверяются только переданные поля.
+    null (удаление значения) не допускается: все поля перевала обязательны.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def reject_nulls(cls, data):
+        if isinstance(data, dict):
+            for name, value in data.items():
+                if value is None and name in cls.model_fields:
+                    raise ValueError(f"Поле '{name}' не может быть null")
+        return data
+
+
+class CoordsPatch(MergePatchModel):
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    height: Optional[int] = None
+
+
+class LevelPatch(MergePatchModel, LevelSchema):
+    winter: Optional[str] = None
+    summer: Optional[str] = None
+    autumn: Optional[str] = None
+    spring: Optional[str] = None
+
+
+# Изображения передаются списком целиком и заменяют текущие
+class SubmitDataUpdateRequest(MergePatchModel):
+    beauty_title: Optional[str] = None
+    title: Optional[str] = None
+    other_titles: Optional[str] = None
+    connect: Optional[str] = None
+    coords: Optional[CoordsPatch] = None
+    level: Optional[LevelPatch] = None
+    images: Optional[List[ImageSchema]] = None
+
+
+# Результат обработки одного элемента пакетной отправки
+class BatchItemResult(str, Enum):
+    created = "created"
+    duplicate = "duplicate"
+    error = "error"
+
+
+class BatchSubmitResult(BaseModel):
+    index: int
+    result: BatchItemResult
+    message: str
+    share_link: str = ""
+
+
+# Результат смены статуса одного перевала при массовой модерации
+class BulkStatusResult(str, Enum):
+    updated = "updated"
+    not_found = "not_found"
+    moderated = "moderated"
+
+
+class BulkStatusItem(BaseModel):
+    id: int
+    result: BulkStatusResult
+
+
+# Перевалы, выданные модератору из очереди модерации
+class ModerationClaimResponse(BaseModel):
+    moderator: str
+    claim_expires_at: datetime
+    perevals: List[SubmitDataResponse]
+
+
+class ModerationReleaseResponse(BaseModel):
+    released: List[int]
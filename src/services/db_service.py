@@ -1,161 +1,563 @@
 import logging
-from typing import Union, List
+from datetime import datetime
+from typing import Any, Dict, Union, List, Optional, Tuple
 
 from fastapi import HTTPException
+from sqlalchemy import func, insert, update, delete, literal, exists, true, case, union_all, null, Select, String, Float, Integer, \
+    ScalarSelect, ColumnElement
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload, aliased
 
 
+from src.core.cache import LRUCache
+from src.core.context import traced_service
 from src.core.config import settings
-from src.models import User, Coords, PerevalAdded, PerevalImages, Level
+from src.core.serialization import dump_model
+from src.db.notify import pereval_listener, pereval_notify_expression, notify_perevals_changed
+from src.models import User, Coords, PerevalAdded, PerevalImages, Level, Status as PerevalStatus, normalized_title, quantized_coords
 from src.schemas.submit import SubmitDataRequest, SubmitDataResponse, Status, CoordsSchema, ImageSchema, UserSchema, SimpleResponse, LevelSchema, \
-    SubmitDataUpdateRequest
+    SubmitDataUpdateRequest, BatchSubmitResult, BatchItemResult, UpdatePerevalResponse, ImageSyncResult, BulkStatusItem, \
+    BulkStatusResult
+from src.services.images import StoredImage, diff_images
+from src.services.pagination import paginate_perevals, split_page
+from src.services.user_service import UserRecord, get_or_create_users, get_cached_user, remember_users, check_user_fio, user_cache
 
 logger = logging.getLogger("my_app")
 
+# Кэш сериализованных ответов GET /submitData/{pereval_id}
+pereval_cache = LRUCache(settings.pereval_cache_size, settings.pereval_cache_ttl)
 
+# Уникальные индексы, по которым ищутся дубликаты перевалов
+DUPLICATE_CONSTRAINTS = {"ux_pereval_added_title_key", "ux_coords_coord_key"}
+
+
+def _violated_constraint(e: IntegrityError) -> Optional[str]:
+    # Имя ограничения передает исключение asyncpg, из которого создано исключение SQLAlchemy
+    return getattr(e.orig.__cause__, "constraint_name", None)
+
+
+# Изменения, сделанные другими воркерами, приходят через LISTEN/NOTIFY
+def _invalidate_cached_pereval(event: str, pereval_id: Optional[int]) -> None:
+    if pereval_id is None:
+        pereval_cache.clear()
+    elif event != "created":
+        pereval_cache.invalidate(pereval_id)
+
+
+pereval_listener.register(_invalidate_cached_pereval)
+
+
+@traced_service
 class SubmitService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_pereval(self, data: SubmitDataRequest, user: User) -> Union[SubmitDataResponse, SimpleResponse]:
-        """Создание нового перевала с координатами и изображениями."""
-        try:
-            query = select(PerevalAdded).where(PerevalAdded.title == data.title)
-            result = await self.db.execute(query)
-            existing_pereval = result.scalars().first()
-
-            if existing_pereval:
-                # Генерируем ссылку на существующий перевал
-                share_link = f"http://{settings.app_host}:{settings.app_port}/submit/get/{existing_pereval.id}"
-
-                # Возвращаем SimpleResponse с нужными данными
-                return SimpleResponse(
-                    state=0,
-                    message=f"Перевал с названием '{data.title}' уже существует!",
-                    share_link=share_link
-                )
+    async def create_pereval(self, data: SubmitDataRequest) -> Union[SubmitDataResponse, SimpleResponse]:
+        """Создание нового перевала с координатами и изображениями.
+
+        Пользователь, координаты, уровень сложности, перевал и изображения записываются одним
+        запросом с цепочкой изменяющих CTE; проверки ФИО и дубликатов выполняются в нем же.
+        Для уже известного email пользователь берется из кэша, и запрос обходится без таблицы users.
+        """
+        for _ in range(2):
+            user = get_cached_user(data.user.email)
+            if user is not None:
+                check_user_fio(user, data.user)
+
+            try:
+                row = (await self.db.execute(self._create_pereval_query(data, user))).one_or_none()
+                await self.db.commit()
+            except IntegrityError as e:
+                await self.db.rollback()
+                user_cache.invalidate(data.user.email)
+                # Параллельный запрос успел создать перевал с тем же названием или координатами
+                # (повторный запрос найдет его как дубликат) либо пользователь из кэша уже удален
+                if _violated_constraint(e) not in DUPLICATE_CONSTRAINTS | {"pereval_added_user_id_fkey"}:
+                    logger.exception("Ошибка целостности при создании перевала %s", data.title)
+                    raise HTTPException(status_code=500, detail=str(e))
+                row = None
+                continue
+            except Exception as e:
+                await self.db.rollback()
+                raise HTTPException(status_code=500, detail=str(e))
+
+            # Пустой результат: пользователя с этим email только что создал параллельный запрос
+            if row is not None:
+                break
+        else:
+            raise HTTPException(status_code=500, detail="Не удалось создать перевал")
+
+        remember_users([UserRecord(row.user_id, data.user.email, row.fam, row.name, row.otc, row.phone)])
+
+        if (row.fam, row.name, row.otc) != (data.user.fam, data.user.name, data.user.otc):
+            logger.info("Пользователь с email %s найден, но ФИО не совпадают.", data.user.email)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Под данным email {data.user.email} уже есть другие ФИО: {row.fam} {row.name} {row.otc}"
+            )
 
-            # Проверка на существование координат с такими же значениями
-            coords_query = select(Coords).where(
-                Coords.latitude == data.coords.latitude,
-                Coords.longitude == data.coords.longitude,
-                Coords.height == data.coords.height
+        if row.title_duplicate_id:
+            return SimpleResponse(
+                state=0,
+                message=f"Перевал с названием '{data.title}' уже существует!",
+                share_link=f"http://{settings.app_host}:{settings.app_port}/submit/get/{row.title_duplicate_id}"
             )
-            coords_result = await self.db.execute(coords_query)
-            existing_coords = coords_result.scalars().first()
-
-            if existing_coords:
-                # Ищем перевал, который связан с найденными координатами
-                pereval_query = select(PerevalAdded).where(PerevalAdded.coord_id == existing_coords.id)
-                pereval_result = await self.db.execute(pereval_query)
-                existing_pereval = pereval_result.scalar_one_or_none()  # Получаем первый перевал (если есть)
-
-                if existing_pereval:
-                    return SimpleResponse(
-                        state=0,
-                        message="Перевал с такими координатами уже существует.",
-                        share_link=f"http://{settings.app_host}:{settings.app_port}/submit/get/{existing_pereval.id}"
-                    )
 
-            # Если координаты не существуют, создаем новые
-            coords = Coords(
-                latitude=data.coords.latitude,
-                longitude=data.coords.longitude,
-                height=data.coords.height
+        if row.coords_duplicate_id:
+            return SimpleResponse(
+                state=0,
+                message="Перевал с такими координатами уже существует.",
+                share_link=self._coords_duplicate_link(row.coords_duplicate_id, row.coords_owner_id)
+            )
+
+        logger.info("Создан перевал %s с ID %s для пользователя %s", data.title, row.pereval_id, data.user.email)
+
+        return SubmitDataResponse(
+            message="Данные успешно отправлены",
+            share_link=f"http://{settings.app_host}:{settings.app_port}/submit/get/{row.pereval_id}",
+            status=row.status,
+            beauty_title=data.beauty_title,
+            title=data.title,
+            other_titles=data.other_titles,
+            connect=data.connect,
+            add_time=row.add_time,
+            updated_at=row.add_time,
+            version=row.version,
+            user=UserSchema(
+                fam=row.fam,
+                name=row.name,
+                otc=row.otc,
+                email=data.user.email,
+                phone=row.phone
+            ),
+            coords=data.coords,
+            level=data.level,
+            images=data.images,
+        )
+
+    @staticmethod
+    def _duplicate_ids(
+        title: Union[str, ColumnElement],
+        coords: Union[CoordsSchema, Tuple[ColumnElement, ColumnElement, ColumnElement]],
+        exclude_id: Optional[int] = None
+    ) -> Tuple[ScalarSelect, ScalarSelect]:
+        """Подзапросы ID перевала с тем же названием и ID строки coords с теми же координатами.
+
+        Оба ищут по уникальным индексам ключей title_key и coord_key, с теми же условиями, что и индексы:
+        координаты занимает и строка coords без перевала. Значения передаются как данные запроса
+        или как SQL-выражения (например, колонки обновляемого перевала).
+        """
+        if isinstance(coords, CoordsSchema):
+            coords = (
+                literal(coords.latitude, Float),
+                literal(coords.longitude, Float),
+                literal(coords.height, Integer)
             )
-            self.db.add(coords)
-            await self.db.flush()
-
-            logger.info("Создание записи уровня сложности")
-            level = Level(
-                winter=data.level.winter,
-                summer=data.level.summer,
-                autumn=data.level.autumn,
-                spring=data.level.spring
+        if isinstance(title, str):
+            title = literal(title, String)
+
+        # Подзапросы не связываются с PerevalAdded и Coords внешнего запроса (например, UPDATE перевала)
+        title_duplicate = select(PerevalAdded.id).where(
+            PerevalAdded.title_key == normalized_title(title)
+        ).correlate_except(PerevalAdded)
+        coords_duplicate = select(Coords.id).where(
+            Coords.coord_key == quantized_coords(*coords)
+        ).correlate_except(Coords)
+        if exclude_id is not None:
+            excluded = aliased(PerevalAdded, name="excluded_pereval")
+            title_duplicate = title_duplicate.where(PerevalAdded.id != exclude_id)
+            coords_duplicate = coords_duplicate.where(
+                Coords.id.not_in(select(excluded.coord_id).where(excluded.id == exclude_id))
             )
 
-            self.db.add(level)
-            await self.db.flush()
-            logger.info(f"Уровень сложности успешно добавлен с ID: {level.id}")
-
-            # Создаем запись о перевале
-            logger.info(f"Создание перевала: {data.title} для пользователя {user.email}")
-            pereval = PerevalAdded(
-                user_id=user.id,
-                coord_id=coords.id,
-                level_id=level.id,
-                beauty_title=data.beauty_title,
-                title=data.title,
-                other_titles=data.other_titles,
-                connect=data.connect,
-                status=Status.new
+        return title_duplicate.scalar_subquery(), coords_duplicate.scalar_subquery()
+
+    @staticmethod
+    def _coords_owner_id(coords_id: ColumnElement) -> ScalarSelect:
+        """Подзапрос ID перевала, которому принадлежит строка coords; NULL для строки без перевала."""
+        return (
+            select(PerevalAdded.id)
+            .where(PerevalAdded.coord_id == coords_id)
+            .correlate_except(PerevalAdded)
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def _coords_duplicate_link(coords_id: int, owner_id: Optional[int]) -> str:
+        if owner_id is None:
+            logger.warning("Координаты с ID %s не связаны ни с одним перевалом, но занимают ключ coord_key", coords_id)
+            return ""
+        return f"http://{settings.app_host}:{settings.app_port}/submit/get/{owner_id}"
+
+    @staticmethod
+    def _create_pereval_query(data: SubmitDataRequest, user: Optional[UserRecord] = None) -> Select:
+        """Запрос создания перевала: WITH user, coords, level, pereval, images SELECT ..."""
+        now = datetime.now()
+
+        if user is not None:
+            # Пользователь из кэша
+            pereval_user = select(
+                literal(user.id, Integer).label("id"),
+                literal(user.fam, String).label("fam"),
+                literal(user.name, String).label("name"),
+                literal(user.otc, String).label("otc"),
+                literal(user.phone, String).label("phone")
+            ).cte("pereval_user")
+        else:
+            # Пользователь: вставка без конфликта по email либо уже существующая запись
+            inserted_user = (
+                pg_insert(User)
+                .values(**data.user.model_dump())
+                .on_conflict_do_nothing(index_elements=[User.email])
+                .returning(User.id, User.fam, User.name, User.otc, User.phone)
+                .cte("inserted_user")
+            )
+            pereval_user = union_all(
+                select(inserted_user.c.id, inserted_user.c.fam, inserted_user.c.name, inserted_user.c.otc, inserted_user.c.phone),
+                select(User.id, User.fam, User.name, User.otc, User.phone).where(
+                    User.email == data.user.email,
+                    ~exists(select(inserted_user.c.id))
+                )
+            ).cte("pereval_user")
+
+        title_duplicate, coords_duplicate = SubmitService._duplicate_ids(data.title, data.coords)
+
+        # Остальные записи создаются, только если ФИО совпали и дубликатов нет
+        new_coords = insert(Coords).from_select(
+            ["latitude", "longitude", "height"],
+            select(
+                literal(data.coords.latitude),
+                literal(data.coords.longitude),
+                literal(data.coords.height)
+            ).where(
+                pereval_user.c.fam == data.user.fam,
+                pereval_user.c.name == data.user.name,
+                pereval_user.c.otc == data.user.otc,
+                title_duplicate.is_(None),
+                coords_duplicate.is_(None)
             )
-            self.db.add(pereval)
-            await self.db.flush()
+        ).returning(Coords.id).cte("new_coords")
+
+        new_level = insert(Level).from_select(
+            ["winter", "summer", "autumn", "spring"],
+            select(
+                literal(data.level.winter),
+                literal(data.level.summer),
+                literal(data.level.autumn),
+                literal(data.level.spring)
+            ).select_from(new_coords)
+        ).returning(Level.id).cte("new_level")
+
+        new_pereval = insert(PerevalAdded).from_select(
+            ["user_id", "coord_id", "level_id", "beauty_title", "title", "other_titles", "connect", "add_time", "updated_at", "status",
+             "version"],
+            select(
+                pereval_user.c.id,
+                new_coords.c.id,
+                new_level.c.id,
+                literal(data.beauty_title),
+                literal(data.title),
+                literal(data.other_titles),
+                literal(data.connect),
+                literal(now, PerevalAdded.add_time.type),
+                literal(now, PerevalAdded.updated_at.type),
+                literal(Status.new, PerevalAdded.status.type),
+                literal(1, Integer)
+            ).select_from(pereval_user).join(new_coords, true()).join(new_level, true())
+        ).returning(PerevalAdded.id, PerevalAdded.add_time, PerevalAdded.status, PerevalAdded.version).cte("new_pereval")
+
+        image_values = func.unnest(
+            literal([img.url for img in data.images], ARRAY(String)),
+            literal([img.title for img in data.images], ARRAY(String)),
+            literal(list(range(len(data.images))), ARRAY(Integer))
+        ).table_valued("url", "title", "position").render_derived()
+        new_images = insert(PerevalImages).from_select(
+            ["pereval_id", "image_url", "title", "position"],
+            select(new_pereval.c.id, image_values.c.url, image_values.c.title, image_values.c.position)
+            .select_from(new_pereval).join(image_values, true())
+        ).returning(PerevalImages.id).cte("new_images")
+
+        return select(
+            pereval_user.c.id.label("user_id"),
+            pereval_user.c.fam,
+            pereval_user.c.name,
+            pereval_user.c.otc,
+            pereval_user.c.phone,
+            title_duplicate.label("title_duplicate_id"),
+            coords_duplicate.label("coords_duplicate_id"),
+            SubmitService._coords_owner_id(coords_duplicate).label("coords_owner_id"),
+            new_pereval.c.id.label("pereval_id"),
+            new_pereval.c.add_time,
+            new_pereval.c.status,
+            new_pereval.c.version,
+            select(func.count()).select_from(new_images).scalar_subquery().label("images_count"),
+            case((new_pereval.c.id.is_not(None), pereval_notify_expression(new_pereval.c.id, "created"))).label("notified")
+        ).select_from(pereval_user).outerjoin(new_pereval, true())
+
+    async def create_perevals_batch(self, items: List[SubmitDataRequest]) -> List[BatchSubmitResult]:
+        """Пакетное создание перевалов в одной транзакции.
+
+        Пользователи и дубликаты по названию и координатам определяются запросами по всему
+        пакету, а записи вставляются многострочными INSERT ... RETURNING.
+        """
+        try:
+            users = await get_or_create_users(self.db, [item.user for item in items])
+            results: List[Optional[BatchSubmitResult]] = [None] * len(items)
+
+            for index, item in enumerate(items):
+                user = users[item.user.email]
+                if (user.fam, user.name, user.otc) != (item.user.fam, item.user.name, item.user.otc):
+                    results[index] = BatchSubmitResult(
+                        index=index,
+                        result=BatchItemResult.error,
+                        message=f"Под данным email {user.email} уже есть другие ФИО: {user.fam} {user.name} {user.otc}"
+                    )
 
-            # Сохраняем изображения
-            images = []
-            for img in data.images:
-                image = PerevalImages(pereval_id=pereval.id, image_url=img.url, title=img.title)
-                self.db.add(image)
-                images.append(image)
-            await self.db.flush()
+            candidates = [index for index in range(len(items)) if results[index] is None]
+
+            # Ключи названий и координат пакета и существующие перевалы с такими же ключами
+            title_values = func.unnest(
+                literal(list({items[index].title for index in candidates}), ARRAY(String))
+            ).table_valued("title").render_derived()
+            title_query = select(
+                title_values.c.title,
+                normalized_title(title_values.c.title),
+                select(PerevalAdded.id).where(
+                    PerevalAdded.title_key == normalized_title(title_values.c.title)
+                ).scalar_subquery()
+            )
+            title_keys = {
+                title: (key, pereval_id)
+                for title, key, pereval_id in (await self.db.execute(title_query)).all()
+            }
+
+            coords_list = list({
+                (items[index].coords.latitude, items[index].coords.longitude, items[index].coords.height)
+                for index in candidates
+            })
+            coords_values = func.unnest(
+                literal([coords[0] for coords in coords_list], ARRAY(Float)),
+                literal([coords[1] for coords in coords_list], ARRAY(Float)),
+                literal([coords[2] for coords in coords_list], ARRAY(Integer))
+            ).table_valued("latitude", "longitude", "height").render_derived()
+            coords_key = quantized_coords(coords_values.c.latitude, coords_values.c.longitude, coords_values.c.height)
+            coords_duplicate = select(Coords.id).where(Coords.coord_key == coords_key).scalar_subquery()
+            coords_query = select(
+                coords_values.c.latitude,
+                coords_values.c.longitude,
+                coords_values.c.height,
+                coords_key,
+                coords_duplicate,
+                self._coords_owner_id(coords_duplicate)
+            )
+            coords_keys = {
+                (latitude, longitude, height): (key, coords_id, owner_id)
+                for latitude, longitude, height, key, coords_id, owner_id in (await self.db.execute(coords_query)).all()
+            }
+
+            # Дубликаты внутри пакета ссылаются на первый элемент с тем же названием или координатами
+            to_create = []
+            batch_titles = {}
+            batch_coords = {}
+            duplicate_of = {}
+            for index in candidates:
+                item = items[index]
+                title_key, title_duplicate_id = title_keys[item.title]
+                coords_key, coords_duplicate_id, coords_owner_id = coords_keys[
+                    (item.coords.latitude, item.coords.longitude, item.coords.height)
+                ]
+
+                if title_duplicate_id:
+                    results[index] = BatchSubmitResult(
+                        index=index,
+                        result=BatchItemResult.duplicate,
+                        message=f"Перевал с названием '{item.title}' уже существует!",
+                        share_link=f"http://{settings.app_host}:{settings.app_port}/submit/get/{title_duplicate_id}"
+                    )
+                elif coords_duplicate_id:
+                    results[index] = BatchSubmitResult(
+                        index=index,
+                        result=BatchItemResult.duplicate,
+                        message="Перевал с такими координатами уже существует.",
+                        share_link=self._coords_duplicate_link(coords_duplicate_id, coords_owner_id)
+                    )
+                elif title_key in batch_titles:
+                    duplicate_of[index] = (batch_titles[title_key], f"Перевал с названием '{item.title}' уже существует!")
+                elif coords_key in batch_coords:
+                    duplicate_of[index] = (batch_coords[coords_key], "Перевал с такими координатами уже существует.")
+                else:
+                    batch_titles[title_key] = index
+                    batch_coords[coords_key] = index
+                    to_create.append(index)
+
+            pereval_ids = {}
+            if to_create:
+                coord_ids = (await self.db.scalars(
+                    insert(Coords).returning(Coords.id, sort_by_parameter_order=True),
+                    [items[index].coords.model_dump() for index in to_create]
+                )).all()
+
+                level_ids = (await self.db.scalars(
+                    insert(Level).returning(Level.id, sort_by_parameter_order=True),
+                    [items[index].level.model_dump() for index in to_create]
+                )).all()
+
+                created_ids = (await self.db.scalars(
+                    insert(PerevalAdded).returning(PerevalAdded.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "user_id": users[items[index].user.email].id,
+                            "coord_id": coord_id,
+                            "level_id": level_id,
+                            "beauty_title": items[index].beauty_title,
+                            "title": items[index].title,
+                            "other_titles": items[index].other_titles,
+                            "connect": items[index].connect,
+                            "status": Status.new,
+                        }
+                        for index, coord_id, level_id in zip(to_create, coord_ids, level_ids)
+                    ]
+                )).all()
+                pereval_ids = dict(zip(to_create, created_ids))
+
+                images = [
+                    {"pereval_id": pereval_ids[index], "image_url": img.url, "title": img.title, "position": position}
+                    for index in to_create
+                    for position, img in enumerate(items[index].images)
+                ]
+                if images:
+                    await self.db.execute(insert(PerevalImages), images)
+
+                await notify_perevals_changed(self.db, created_ids, "created")
 
             await self.db.commit()
+            remember_users(users.values())
+            logger.info("Пакетная отправка: создано %s из %s перевалов", len(pereval_ids), len(items))
+
+            for index, pereval_id in pereval_ids.items():
+                results[index] = BatchSubmitResult(
+                    index=index,
+                    result=BatchItemResult.created,
+                    message="Данные успешно отправлены",
+                    share_link=f"http://{settings.app_host}:{settings.app_port}/submit/get/{pereval_id}"
+                )
+            for index, (original_index, message) in duplicate_of.items():
+                results[index] = BatchSubmitResult(
+                    index=index,
+                    result=BatchItemResult.duplicate,
+                    message=message,
+                    share_link=f"http://{settings.app_host}:{settings.app_port}/submit/get/{pereval_ids[original_index]}"
+                )
 
-            return SubmitDataResponse(
-                message="Данные успешно отправлены",
-                share_link=f"http://{settings.app_host}:{settings.app_port}/submit/get/{pereval.id}",
-                status=pereval.status,
-                beauty_title=pereval.beauty_title,
-                title=pereval.title,
-                other_titles=pereval.other_titles,
-                connect=pereval.connect,
-                add_time=pereval.add_time,
-                user=UserSchema(
-                    fam=user.fam,
-                    name=user.name,
-                    otc=user.otc,
-                    email=user.email,
-                    phone=user.phone
-                ),
-                coords=CoordsSchema(
-                    latitude=coords.latitude,
-                    longitude=coords.longitude,
-                    height=coords.height
-                ),
-                level=LevelSchema(
-                    winter=level.winter,
-                    summer=level.summer,
-                    autumn=level.autumn,
-                    spring=level.spring
-                ),
-                images=[ImageSchema(url=image.image_url, title=image.title) for image in images],
-            )
+            return results
         except Exception as e:
             await self.db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def update_pereval_status(self, pereval_id: int, status: Status):
-        """Обновление статуса перевала."""
-        async with self.db.begin():
-            query = select(PerevalAdded).where(PerevalAdded.id == pereval_id)
-            result = await self.db.execute(query)
-            pereval = result.scalar_one_or_none()
-
-            if not pereval:
-                raise HTTPException(status_code=404, detail="Перевал не найден")
+    async def update_pereval_status(self, pereval_id: int, status: PerevalStatus, versions: Optional[List[int]] = None):
+        """Обновление статуса перевала одним условным UPDATE.
 
-            # Проверка, можно ли изменить статус
-            if pereval.status in [Status.accepted, Status.rejected]:
-                raise HTTPException(status_code=400, detail="Статус нельзя изменить после модерации")
+        versions - допустимые версии из If-Match (None - без проверки версии). Если перевал
+        успели изменить, возвращается 409.
+        """
+        conditions = [
+            PerevalAdded.id == pereval_id,
+            PerevalAdded.status.not_in([PerevalStatus.accepted, PerevalStatus.rejected]),
+        ]
+        if versions is not None:
+            conditions.append(PerevalAdded.version.in_(versions))
+
+        updated_pereval = (
+            update(PerevalAdded)
+            .where(*conditions)
+            .values(status=status, updated_at=datetime.now(), version=PerevalAdded.version + 1)
+            .returning(PerevalAdded.id, PerevalAdded.status, PerevalAdded.version)
+            .cte("updated_pereval")
+        )
+        query = select(
+            updated_pereval.c.id,
+            updated_pereval.c.status,
+            updated_pereval.c.version,
+            pereval_notify_expression(updated_pereval.c.id, "status")
+        )
 
-            pereval.status = status
-            await self.db.flush()
+        async with self.db.begin():
+            row = (await self.db.execute(query)).one_or_none()
+
+            if row is None:
+                # Причина отказа определяется только при неудаче, отдельным запросом
+                current = (await self.db.execute(
+                    select(PerevalAdded.status, PerevalAdded.version).where(PerevalAdded.id == pereval_id)
+                )).one_or_none()
+
+                if current is None:
+                    raise HTTPException(status_code=404, detail="Перевал не найден")
+                if versions is not None and current.version not in versions:
+                    raise HTTPException(status_code=409, detail="Перевал был изменен другим запросом")
+                if current.status in (PerevalStatus.accepted, PerevalStatus.rejected):
+                    raise HTTPException(status_code=400, detail="Статус нельзя изменить после модерации")
+                raise HTTPException(status_code=409, detail="Перевал был изменен другим запросом")
+
+        pereval_cache.invalidate(pereval_id)
+
+        return {"message": "Статус обновлен", "pereval_id": row.id, "status": row.status, "version": row.version}
+
+    async def update_perevals_status(self, pereval_ids: List[int], status: PerevalStatus) -> List[BulkStatusItem]:
+        """Массовая смена статуса одним запросом.
+
+        WITH UPDATE ... WHERE id = ANY(:ids) AND статус не финальный RETURNING id, а результат по каждому ID
+        (обновлен, не найден, уже промодерирован) получается соединением списка ID с обновленными строками.
+        """
+        pereval_ids = list(dict.fromkeys(pereval_ids))
+        ids_param = literal(pereval_ids, ARRAY(Integer))
+
+        updated_perevals = (
+            update(PerevalAdded)
+            .where(
+                PerevalAdded.id == func.any(ids_param),
+                PerevalAdded.status.not_in([PerevalStatus.accepted, PerevalStatus.rejected])
+            )
+            .values(status=status, updated_at=datetime.now(), version=PerevalAdded.version + 1)
+            .returning(PerevalAdded.id)
+            .cte("updated_perevals")
+        )
+        ids = func.unnest(ids_param).table_valued("id").render_derived()
+        query = (
+            select(
+                ids.c.id,
+                updated_perevals.c.id.is_not(None).label("updated"),
+                PerevalAdded.id.is_not(None).label("found"),
+                case((updated_perevals.c.id.is_not(None), pereval_notify_expression(ids.c.id, "status"))).label("notified")
+            )
+            .select_from(ids)
+            .outerjoin(updated_perevals, updated_perevals.c.id == ids.c.id)
+            .outerjoin(PerevalAdded, PerevalAdded.id == ids.c.id)
+        )
 
-        return {"message": "Статус обновлен", "pereval_id": pereval.id, "status": pereval.status}
+        async with self.db.begin():
+            rows = {row.id: row for row in (await self.db.execute(query)).all()}
+
+        results = []
+        for pereval_id in pereval_ids:
+            row = rows[pereval_id]
+            if row.updated:
+                pereval_cache.invalidate(pereval_id)
+                result = BulkStatusResult.updated
+            elif row.found:
+                result = BulkStatusResult.moderated
+            else:
+                result = BulkStatusResult.not_found
+            results.append(BulkStatusItem(id=pereval_id, result=result))
+
+        logger.info(
+            "Массовая смена статуса на %s: обновлено %s из %s",
+            status.value, sum(item.result == BulkStatusResult.updated for item in results), len(results)
+        )
+        return results
 
     async def get_pereval(self, pereval_id: int) -> SubmitDataResponse:
         """Получение перевала с пользователем, координатами и изображениями и сложностью."""
@@ -181,6 +583,8 @@ class SubmitService:
             other_titles=pereval.other_titles,
             connect=pereval.connect,
             add_time=pereval.add_time,
+            updated_at=pereval.updated_at,
+            version=pereval.version,
             user=UserSchema(
                 fam=pereval.user.fam,
                 name=pereval.user.name,
@@ -202,16 +606,61 @@ class SubmitService:
             images=[ImageSchema(url=image.image_url, title=image.title) for image in pereval.images],
         )
 
-    async def get_all_perevals(self) -> List[SubmitDataResponse]:
+    async def get_pereval_json(self, pereval_id: int, fill_cache: bool = True) -> Tuple[bytes, int, datetime]:
+        """Сериализованный ответ get_pereval, версия и время изменения перевала, с чтением через кэш.
+
+        fill_cache=False для сессии реплики: реплика может еще не получить запись, после которой
+        кэш был сброшен, и устаревший перевал вернулся бы в кэш на весь срок жизни записи.
+        """
+        cached = pereval_cache.get(pereval_id)
+        if cached is None:
+            generation = pereval_cache.generation()
+            pereval = await self.get_pereval(pereval_id)
+            cached = (dump_model(SubmitDataResponse, pereval), pereval.version, pereval.updated_at)
+            if fill_cache:
+                pereval_cache.set(pereval_id, cached, generation)
+        return cached
+
+    async def get_pereval_version(self, pereval_id: int) -> Tuple[int, datetime]:
+        """Версия и время последнего изменения перевала, без загрузки связанных данных."""
+        query = select(PerevalAdded.version, PerevalAdded.updated_at).where(PerevalAdded.id == pereval_id)
+        result = await self.db.execute(query)
+        row = result.one_or_none()
+
+        if not row:
+            raise HTTPException(status_code=404, detail="Перевал не найден")
+
+        return row.version, row.updated_at
+
+    async def get_perevals_by_user_email_version(self, email: str) -> Tuple[int, Optional[datetime]]:
+        """Число перевалов пользователя и время последнего изменения среди них."""
+        query = (
+            select(func.count(PerevalAdded.id), func.max(PerevalAdded.updated_at))
+            .join(PerevalAdded.user)
+            .where(User.email == email)
+        )
+        result = await self.db.execute(query)
+        return tuple(result.one())
+
+    async def get_all_perevals(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[Status] = None,
+        add_time_from: Optional[datetime] = None,
+        add_time_to: Optional[datetime] = None,
+    ) -> Tuple[List[SubmitDataResponse], Optional[str]]:
+        """Страница перевалов (от новых к старым) и курсор следующей страницы."""
         query = select(PerevalAdded).options(
             joinedload(PerevalAdded.user),
             joinedload(PerevalAdded.coords),
             joinedload(PerevalAdded.level),
-            joinedload(PerevalAdded.images)
+            selectinload(PerevalAdded.images)
         )
+        query = paginate_perevals(query, limit, cursor, status, add_time_from, add_time_to)
 
         result = await self.db.execute(query)
-        perevals = result.unique().scalars().all()  # Используем unique(), чтобы обработать коллекции корректно
+        perevals, next_cursor = split_page(result.scalars().all(), limit)
 
         if not perevals:
             raise HTTPException(status_code=404, detail="Перевалы не найдены")
@@ -225,6 +674,8 @@ class SubmitService:
             other_titles=pereval.other_titles,
             connect=pereval.connect,
             add_time=pereval.add_time,
+            updated_at=pereval.updated_at,
+            version=pereval.version,
             user=UserSchema(
                 fam=pereval.user.fam,
                 name=pereval.user.name,
@@ -244,134 +695,266 @@ class SubmitService:
                 spring=pereval.level.spring
             ),
             images=[ImageSchema(url=image.image_url, title=image.title) for image in pereval.images],
-        ) for pereval in perevals]
+        ) for pereval in perevals], next_cursor
 
-    async def update_pereval(self, pereval_id: int, data: SubmitDataUpdateRequest) -> SimpleResponse:
-        """Обновление существующей записи перевала."""
+    async def _sync_images(self, pereval_id: int, images: List[ImageSchema]) -> ImageSyncResult:
+        """Приведение изображений перевала к переданным: одним DELETE удаленных, одним многострочным INSERT
+        добавленных и одним UPDATE строк с новым названием или позицией. Неизмененные строки не затрагиваются.
+        """
+        query = (
+            select(PerevalImages.id, PerevalImages.image_url, PerevalImages.title, PerevalImages.position)
+            .where(PerevalImages.pereval_id == pereval_id)
+            .order_by(PerevalImages.position, PerevalImages.id)
+        )
+        stored = [StoredImage(*row) for row in (await self.db.execute(query)).all()]
+        diff = diff_images(stored, images)
+
+        if diff.removed:
+            await self.db.execute(
+                delete(PerevalImages)
+                .where(PerevalImages.id.in_([image.id for image in diff.removed]))
+                .execution_options(synchronize_session=False)
+            )
 
-        async with self.db.begin():
-            # Получаем перевал по ID
-            query = select(PerevalAdded).where(PerevalAdded.id == pereval_id)
-            result = await self.db.execute(query)
-            pereval = result.scalar_one_or_none()
-
-            if not pereval:
-                # Перевал не найден, возвращаем ошибку
-                logger.error(f"Перевал с ID {pereval_id} не найден")
-                return SimpleResponse(
-                    state=0,
-                    message="Перевал не найден",
-                    share_link=""
-                )
+        if diff.added:
+            await self.db.execute(insert(PerevalImages).values([
+                {"pereval_id": pereval_id, "image_url": image.url, "title": image.title, "position": position}
+                for position, image in diff.added
+            ]))
+
+        if diff.changed:
+            changes = func.unnest(
+                literal([image.id for image, _, _ in diff.changed], ARRAY(Integer)),
+                literal([title for _, title, _ in diff.changed], ARRAY(String)),
+                literal([position for _, _, position in diff.changed], ARRAY(Integer))
+            ).table_valued("id", "title", "position").render_derived()
+            await self.db.execute(
+                update(PerevalImages)
+                .where(PerevalImages.id == changes.c.id)
+                .values(title=changes.c.title, position=changes.c.position)
+                .execution_options(synchronize_session=False)
+            )
 
-            logger.info(f"Перевал с ID {pereval_id} найден, статус: {pereval.status.value}")
+        retitled = [(image, title) for image, title, _ in diff.changed if image.title != title]
+        moved = [(image, title) for image, title, position in diff.changed if image.position != position]
+        logger.info(
+            "Изображения перевала ID %s: добавлено %s, удалено %s, переименовано %s, перемещено %s",
+            pereval_id, len(diff.added), len(diff.removed), len(retitled), len(moved)
+        )
+        return ImageSyncResult(
+            added=[image for _, image in diff.added],
+            removed=[ImageSchema(url=image.url, title=image.title) for image in diff.removed],
+            retitled=[ImageSchema(url=image.url, title=title) for image, title in retitled],
+            moved=[ImageSchema(url=image.url, title=title) for image, title in moved],
+        )
 
-            # Проверяем, можно ли редактировать запись (только если статус `new`)
-            if pereval.status.value != "new":
-                return SimpleResponse(
-                    state=0,
-                    message="Запись можно редактировать только в статусе new",
-                    share_link=""
-                )
+    async def _update_failure(
+        self, pereval_id: int, data: SubmitDataUpdateRequest, versions: Optional[List[int]]
+    ) -> SimpleResponse:
+        """Причина, по которой условный UPDATE перевала не изменил ни одной строки."""
+        changes = data.model_dump(exclude_unset=True)
+        coords_values = changes.get("coords", {})
+
+        target = aliased(PerevalAdded, name="target")
+        target_coords = aliased(Coords, name="target_coords")
+        title_duplicate, coords_duplicate = self._duplicate_ids(
+            changes.get("title", target.title), self._merged_coords(target_coords, coords_values), exclude_id=pereval_id
+        )
+        query = (
+            select(
+                target.status,
+                target.version,
+                (title_duplicate if "title" in changes else null()).label("title_duplicate_id"),
+                (coords_duplicate if coords_values else null()).label("coords_duplicate_id"),
+                (self._coords_owner_id(coords_duplicate) if coords_values else null()).label("coords_owner_id"),
+            )
+            .join(target_coords, target_coords.id == target.coord_id)
+            .where(target.id == pereval_id)
+        )
+        pereval = (await self.db.execute(query)).one_or_none()
 
-            # Проверка на уникальность координат
-            coords_query = select(Coords).where(
-                Coords.latitude == data.coords.latitude,
-                Coords.longitude == data.coords.longitude,
-                Coords.height == data.coords.height
+        if not pereval:
+            logger.error("Перевал с ID %s не найден", pereval_id)
+            return SimpleResponse(
+                state=0,
+                message="Перевал не найден",
+                share_link=""
             )
-            coords_result = await self.db.execute(coords_query)
-            coords_list = coords_result.scalars().all()  # Получаем все результаты
-
-            # Если найдены другие записи с такими же координатами, проверяем их
-            if coords_list:
-                for coord in coords_list:
-                    # Исключаем проверку для перевала, который мы редактируем
-                    if coord.id != pereval.coord_id:
-                        # Получаем перевал, который использует эти координаты
-                        related_pereval = await self.db.execute(
-                            select(PerevalAdded).where(PerevalAdded.coord_id == coord.id)
-                        )
-                        related_pereval = related_pereval.scalar_one_or_none()
-
-                        if related_pereval:
-                            share_link = f"http://{settings.app_host}:{settings.app_port}/submit/get/{related_pereval.id}"
-                            logger.error(f"Координаты {data.coords} уже заняты перевалом с ID {related_pereval.id}.")
-                            return SimpleResponse(
-                                state=0,
-                                message="Координаты уже заняты другим перевалом",
-                                share_link=share_link
-                            )
-
-            # Проверка на уникальность названия (title)
-            title_query = select(PerevalAdded).where(PerevalAdded.title == data.title)
-            title_result = await self.db.execute(title_query)
-            title_list = title_result.scalars().all()
-
-            if title_list:
-                for title in title_list:
-                    if title.id != pereval.id:
-                        related_pereval = await self.db.execute(
-                            select(PerevalAdded).where(PerevalAdded.title == title.title)
-                        )
-                        related_pereval = related_pereval.scalar_one_or_none()
-
-                        if related_pereval:
-                            share_link = f"http://{settings.app_host}:{settings.app_port}/submit/get/{related_pereval.id}"
-                            logger.error(f"Перевал с названием {data.title} уже существует: ID {related_pereval.id}.")
-                            return SimpleResponse(
-                                state=0,
-                                message="Перевал с таким названием уже существует",
-                                share_link=share_link
-                            )
-
-            # Обновляем перевал
-            pereval.beauty_title = data.beauty_title
-            pereval.title = data.title
-            pereval.other_titles = data.other_titles
-            pereval.connect = data.connect
-
-            # Обновляем координаты
-            coords_query = select(Coords).where(Coords.id == pereval.coord_id)
-            coords_result = await self.db.execute(coords_query)
-            coords = coords_result.scalar_one_or_none()
-            if coords:
-                coords.latitude = data.coords.latitude
-                coords.longitude = data.coords.longitude
-                coords.height = data.coords.height
-
-            # Обновляем уровень сложности
-            level_query = select(Level).where(Level.id == pereval.level_id)
-            level_result = await self.db.execute(level_query)
-            level = level_result.scalar_one_or_none()
-            if level:
-                level.winter = data.level.winter
-                level.summer = data.level.summer
-                level.autumn = data.level.autumn
-                level.spring = data.level.spring
-
-            # Обновляем изображения, если переданы новые
-            if data.images:
-                delete_query = select(PerevalImages).where(PerevalImages.pereval_id == pereval.id)
-                result = await self.db.execute(delete_query)
-                old_images = result.scalars().all()
-                for img in old_images:
-                    await self.db.delete(img)
-
-                for img in data.images:
-                    new_image = PerevalImages(pereval_id=pereval.id, image_url=img.url, title=img.title)
-                    self.db.add(new_image)
 
-            await self.db.commit()
+        if versions is not None and pereval.version not in versions:
+            logger.info("Перевал с ID %s изменен другим запросом: версия %s", pereval_id, pereval.version)
+            raise HTTPException(status_code=409, detail="Перевал был изменен другим запросом")
 
-            logger.info(f"Перевал ID {pereval.id} успешно обновлен.")
+        # Редактировать можно только запись в статусе `new`
+        if pereval.status != PerevalStatus.new:
+            logger.info("Перевал с ID %s в статусе %s не редактируется", pereval_id, pereval.status.value)
+            return SimpleResponse(
+                state=0,
+                message="Запись можно редактировать только в статусе new",
+                share_link=""
+            )
 
-            share_link = f"http://{settings.app_host}:{settings.app_port}/submit/get/{pereval.id}"
+        if pereval.coords_duplicate_id:
+            logger.error("Координаты %s уже заняты перевалом с ID %s.", data.coords, pereval.coords_owner_id)
+            return SimpleResponse(
+                state=0,
+                message="Координаты уже заняты другим перевалом",
+                share_link=self._coords_duplicate_link(pereval.coords_duplicate_id, pereval.coords_owner_id)
+            )
 
+        if pereval.title_duplicate_id:
+            share_link = f"http://{settings.app_host}:{settings.app_port}/submit/get/{pereval.title_duplicate_id}"
+            logger.error("Перевал с названием %s уже существует: ID %s.", data.title, pereval.title_duplicate_id)
             return SimpleResponse(
+                state=0,
+                message="Перевал с таким названием уже существует",
+                share_link=share_link
+            )
+
+        # Условие не выполнилось, но к моменту проверки запись изменили обратно
+        raise HTTPException(status_code=409, detail="Перевал был изменен другим запросом")
+
+    async def _unchanged_pereval(self, pereval_id: int, versions: Optional[List[int]]) -> Union[UpdatePerevalResponse, SimpleResponse]:
+        """Ответ на пустое изменение: перевал не записывается, версия и ETag клиентов остаются прежними."""
+        query = select(PerevalAdded.status, PerevalAdded.version).where(PerevalAdded.id == pereval_id)
+        pereval = (await self.db.execute(query)).one_or_none()
+
+        if not pereval:
+            logger.error("Перевал с ID %s не найден", pereval_id)
+            return SimpleResponse(
+                state=0,
+                message="Перевал не найден",
+                share_link=""
+            )
+
+        if versions is not None and pereval.version not in versions:
+            logger.info("Перевал с ID %s изменен другим запросом: версия %s", pereval_id, pereval.version)
+            raise HTTPException(status_code=409, detail="Перевал был изменен другим запросом")
+
+        if pereval.status != PerevalStatus.new:
+            logger.info("Перевал с ID %s в статусе %s не редактируется", pereval_id, pereval.status.value)
+            return SimpleResponse(
+                state=0,
+                message="Запись можно редактировать только в статусе new",
+                share_link=""
+            )
+
+        logger.info("Перевал ID %s не изменен: в запросе нет изменений", pereval_id)
+        return UpdatePerevalResponse(
+            state=1,
+            message="Изменений нет",
+            share_link=f"http://{settings.app_host}:{settings.app_port}/submit/get/{pereval_id}",
+            version=pereval.version,
+            images=None
+        )
+
+    @staticmethod
+    def _merged_coords(current: Coords, coords_values: Dict[str, Any]) -> Tuple[ColumnElement, ColumnElement, ColumnElement]:
+        """Итоговые координаты: переданные значения, а непереданные - из текущей записи."""
+        return tuple(
+            literal(coords_values[name], column.type) if name in coords_values else column
+            for name, column in (
+                ("latitude", current.latitude),
+                ("longitude", current.longitude),
+                ("height", current.height),
+            )
+        )
+
+    async def update_pereval(
+        self, pereval_id: int, data: SubmitDataUpdateRequest, versions: Optional[List[int]] = None
+    ) -> Union[UpdatePerevalResponse, SimpleResponse]:
+        """Частичное обновление перевала (JSON Merge Patch): записываются только переданные поля.
+
+        Проверки статуса, версии (versions из If-Match) и дубликатов входят в условие единственного
+        запроса UPDATE, который обновляет перевал, координаты и сложность. Причина отказа выясняется
+        отдельным запросом, только если ни одна строка не изменилась.
+        """
+        changes = data.model_dump(exclude_unset=True)
+        pereval_values = {
+            name: changes[name] for name in ("beauty_title", "title", "other_titles", "connect") if name in changes
+        }
+        coords_values = changes.get("coords", {})
+        level_values = changes.get("level", {})
+
+        # Пустой патч ({} или только пустые вложенные объекты и список изображений) ничего не записывает
+        if not (pereval_values or coords_values or level_values or data.images):
+            return await self._unchanged_pereval(pereval_id, versions)
+
+        conditions = [PerevalAdded.id == pereval_id, PerevalAdded.status == PerevalStatus.new]
+        if versions is not None:
+            conditions.append(PerevalAdded.version.in_(versions))
+
+        # Дубликаты ищутся для итоговых значений: непереданные координаты берутся из текущей записи
+        target_coords = aliased(Coords, name="target_coords")
+        title_duplicate, coords_duplicate = self._duplicate_ids(
+            pereval_values.get("title", PerevalAdded.title),
+            self._merged_coords(target_coords, coords_values),
+            exclude_id=pereval_id
+        )
+        if "title" in pereval_values:
+            conditions.append(title_duplicate.is_(None))
+        if coords_values:
+            conditions.extend([target_coords.id == PerevalAdded.coord_id, coords_duplicate.is_(None)])
+
+        # WITH UPDATE перевала ... RETURNING, затем UPDATE ... FROM для координат и сложности этого перевала
+        updated_pereval = (
+            update(PerevalAdded)
+            .where(*conditions)
+            .values(**pereval_values, updated_at=datetime.now(), version=PerevalAdded.version + 1)
+            .returning(PerevalAdded.id, PerevalAdded.coord_id, PerevalAdded.level_id, PerevalAdded.version)
+            .cte("updated_pereval")
+        )
+        update_query = select(
+            updated_pereval.c.id,
+            updated_pereval.c.version,
+            pereval_notify_expression(updated_pereval.c.id, "updated")
+        )
+        if coords_values:
+            update_query = update_query.add_cte(
+                update(Coords)
+                .where(Coords.id == updated_pereval.c.coord_id)
+                .values(**coords_values)
+                .returning(Coords.id)
+                .cte("updated_coords")
+            )
+        if level_values:
+            update_query = update_query.add_cte(
+                update(Level)
+                .where(Level.id == updated_pereval.c.level_id)
+                .values(**level_values)
+                .returning(Level.id)
+                .cte("updated_level")
+            )
+
+        async with self.db.begin():
+            try:
+                row = (await self.db.execute(update_query)).one_or_none()
+            except IntegrityError as e:
+                if _violated_constraint(e) not in DUPLICATE_CONSTRAINTS:
+                    logger.exception("Ошибка целостности при обновлении перевала ID %s", pereval_id)
+                    raise HTTPException(status_code=500, detail=str(e))
+                # Параллельный запрос занял то же название или координаты
+                raise HTTPException(status_code=409, detail="Перевал был изменен другим запросом")
+
+            if row is None:
+                return await self._update_failure(pereval_id, data, versions)
+
+            # Изображения заменяются, только если передан непустой список: меняются лишь отличающиеся строки
+            images = await self._sync_images(pereval_id, data.images) if data.images else None
+
+            await self.db.commit()
+            pereval_cache.invalidate(pereval_id)
+
+            logger.info("Перевал ID %s обновлен до версии %s, поля: %s", pereval_id, row.version, ", ".join(changes) or "-")
+
+            share_link = f"http://{settings.app_host}:{settings.app_port}/submit/get/{pereval_id}"
+
+            return UpdatePerevalResponse(
                 state=1,
                 message="Запись успешно обновлена",
-                share_link=share_link
+                share_link=share_link,
+                version=row.version,
+                images=images
             )
 
     async def get_perevals_by_user_email(self, email: str):
@@ -404,6 +987,8 @@ class SubmitService:
                 other_titles=pereval.other_titles,
                 connect=pereval.connect,
                 add_time=pereval.add_time,
+                updated_at=pereval.updated_at,
+                version=pereval.version,
                 user=UserSchema(
                     fam=pereval.user.fam,
                     name=pereval.user.name,
@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import AsyncIterator, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select, delete, exists, func, cast, and_, tuple_, literal, BigInteger, Text, ColumnElement
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.serialization import dump_json
+from src.db.db import async_session
+from src.db.notify import pereval_listener
+from src.models import PerevalEvent
+
+logger = logging.getLogger("my_app")
+
+# Позиция в журнале событий: (txid, id) последнего отданного события
+Cursor = Tuple[int, int]
+
+# Через сколько миллисекунд браузер переподключается после разрыва
+RETRY_MS = 3000
+# Как часто воркер удаляет события старше срока хранения, секунд
+PRUNE_INTERVAL = 3600
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+class FeedEvent(NamedTuple):
+    txid: int
+    id: int
+    event: str
+    pereval_id: int
+
+    @property
+    def cursor(self) -> Cursor:
+        return self.txid, self.id
+
+    def encode(self) -> bytes:
+        data = dump_json({"id": self.pereval_id, "event": self.event})
+        return f"id: {format_cursor(self.cursor)}\nevent: {self.event}\ndata: ".encode() + data + b"\n\n"
+
+
+def format_cursor(cursor: Cursor) -> str:
+    return f"{cursor[0]}-{cursor[1]}"
+
+
+def parse_cursor(value: Optional[str]) -> Optional[Cursor]:
+    """Курсор из заголовка Last-Event-ID; None, если значение некорректно."""
+    txid, _, event_id = (value or "").partition("-")
+    try:
+        return int(txid), int(event_id)
+    except ValueError:
+        return None
+
+
+def reset_frame(cursor: Cursor) -> bytes:
+    """Клиент должен заново загрузить перевалы: часть событий ему недоступна."""
+    return f"id: {format_cursor(cursor)}\nevent: reset\ndata: {{}}\n\n".encode()
+
+
+def _after(cursor: Cursor) -> ColumnElement:
+    return tuple_(PerevalEvent.txid, PerevalEvent.id) > tuple_(literal(cursor[0], BigInteger), literal(cursor[1], BigInteger))
+
+
+def _snapshot_xmin() -> ColumnElement:
+    # Транзакции с меньшим номером завершены: их события уже не появятся в журнале
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+
+async def fetch_events(db: AsyncSession, after: Cursor, limit: int) -> Tuple[List[FeedEvent], Cursor]:
+    """События после курсора after из завершенных транзакций, не больше limit, в порядке (txid, id).
+
+    Вторым элементом возвращается позиция, до которой журнал прочитан полностью.
+    Номер события выделяется до COMMIT, поэтому события по id фиксируются не по порядку;
+    события незавершенных транзакций откладываются, и курсор клиента их не пропускает.
+    """
+    snapshot = select(_snapshot_xmin().label("xmin")).cte("snapshot")
+    query = (
+        select(snapshot.c.xmin, PerevalEvent.txid, PerevalEvent.id, PerevalEvent.event, PerevalEvent.pereval_id)
+        .select_from(snapshot)
+        .outerjoin(PerevalEvent, and_(
+            _after(after),
+            PerevalEvent.txid < snapshot.c.xmin
+        ))
+        .order_by(PerevalEvent.txid, PerevalEvent.id)
+        .limit(limit)
+    )
+    rows = (await db.execute(query)).all()
+    events = [FeedEvent(row.txid, row.id, row.event, row.pereval_id) for row in rows if row.id is not None]
+
+    if len(events) == limit:
+        return events, events[-1].cursor
+    return events, max(events[-1].cursor if events else after, (rows[0].xmin, 0))
+
+
+async def current_position(db: AsyncSession) -> Cursor:
+    """Позиция, до которой журнал уже не изменится."""
+    return (await db.execute(select(_snapshot_xmin()))).scalar_one(), 0
+
+
+class Subscriber:
+    """Очередь событий одного клиента. При переполнении очередь очищается,
+    а вместо потерянных событий клиент получает reset.
+    """
+
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue[Optional[FeedEvent]] = asyncio.Queue(size)
+        self.reset_position: Optional[Cursor] = None
+
+    def put(self, event: FeedEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.reset_position = event.cursor
+            self.queue.put_nowait(None)
+
+
+class PerevalEventFeed:
+    """Лента изменений перевалов для SSE-клиентов воркера.
+
+    Журнал pereval_events читается одним запросом на воркер, и события раздаются очередям клиентов.
+    Чтение запускается уведомлением LISTEN/NOTIFY от любого воркера, а также раз в poll_interval
+    секунд на случай потерянных уведомлений и событий, отложенных до завершения транзакций.
+    """
+
+    def __init__(self, sessionmaker: async_sessionmaker, poll_interval: float):
+        self._sessionmaker = sessionmaker
+        self._poll_interval = poll_interval
+        self._subscribers: Set[Subscriber] = set()
+        self._cursor: Optional[Cursor] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._pruned_at = 0.0
+
+    def wake(self, event: str, pereval_id: Optional[int]) -> None:
+        """Обработчик слушателя канала: в журнале появились события."""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._cursor = None
+
+    async def subscribe(self) -> Subscriber:
+        if self._cursor is None:
+            # Первый клиент: лента начинается с текущей позиции журнала
+            async with self._sessionmaker() as db:
+                position = await current_position(db)
+            if self._cursor is None:
+                self._cursor = position
+        subscriber = Subscriber(settings.pereval_feed_queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    async def replay(self, last_event_id: str) -> Tuple[Optional[List[FeedEvent]], Cursor]:
+        """События после Last-Event-ID и позиция, на которой они заканчиваются.
+
+        Вместо списка возвращается None, если событий больше pereval_feed_replay_max,
+        часть их удалена по сроку хранения или значение заголовка некорректно.
+        """
+        after = parse_cursor(last_event_id)
+        limit = settings.pereval_feed_replay_max
+        async with self._sessionmaker() as db:
+            if after is not None:
+                # Событие клиента или более ранние еще в журнале: следующие за ним не удалялись
+                retained = (await db.execute(select(exists().where(~_after(after))))).scalar_one()
+                if retained:
+                    events, _ = await fetch_events(db, after, limit + 1)
+                    if len(events) <= limit:
+                        return events, events[-1].cursor if events else after
+            return None, await current_position(db)
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Поток SSE: события после Last-Event-ID из журнала, затем новые события."""
+        subscriber = await self.subscribe()
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+
+            # Очередь заполняется с момента подписки, поэтому события, уже отданные из журнала, пропускаются
+            cursor = None
+            if last_event_id is not None:
+                events, cursor = await self.replay(last_event_id)
+                if events is None:
+                    yield reset_frame(cursor)
+                else:
+                    for event in events:
+                        yield event.encode()
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), settings.pereval_feed_heartbeat)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+
+                if event is None:
+                    cursor = subscriber.reset_position
+                    yield reset_frame(cursor)
+                elif cursor is None or event.cursor > cursor:
+                    yield event.encode()
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def _run(self) -> None:
+        delay = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            # Любая ошибка, кроме отмены задачи, не должна останавливать ленту до конца жизни воркера
+            try:
+                await self._poll()
+                await self._prune()
+                delay = 0
+            except Exception:
+                logger.exception("Ошибка чтения журнала событий перевалов")
+                delay = min(delay * 2 or 1, 30)
+                await asyncio.sleep(delay)
+
+    async def _poll(self) -> None:
+        if not self._subscribers:
+            # Без клиентов журнал не читается; следующий клиент начнет с текущей позиции
+            self._cursor = None
+            return
+
+        batch = settings.pereval_feed_replay_max
+        async with self._sessionmaker() as db:
+            while True:
+                events, self._cursor = await fetch_events(db, self._cursor, batch)
+                for subscriber in list(self._subscribers):
+                    for event in events:
+                        subscriber.put(event)
+                if len(events) < batch:
+                    return
+
+    async def _prune(self) -> None:
+        if time.monotonic() - self._pruned_at < PRUNE_INTERVAL:
+            return
+        self._pruned_at = time.monotonic()
+
+        retention = timedelta(hours=settings.pereval_feed_retention_hours)
+        async with self._sessionmaker() as db:
+            result = await db.execute(delete(PerevalEvent).where(PerevalEvent.created_at < func.now() - retention))
+            await db.commit()
+        if result.rowcount:
+            logger.info("Удалено устаревших событий перевалов: %s", result.rowcount)
+
+
+# Лента воркера: просыпается по уведомлениям об изменениях перевалов
+pereval_feed = PerevalEventFeed(async_session, settings.pereval_feed_poll_interval)
+pereval_listener.register(pereval_feed.wake)
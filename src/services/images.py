@@ -0,0 +1,56 @@
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.schemas.submit import ImageSchema
+
+
+# Изображение перевала в БД
+class StoredImage(NamedTuple):
+    id: int
+    url: str
+    title: str
+    position: int
+
+
+# Изменения, переводящие сохраненные изображения в переданные.
+# added - (позиция, изображение); changed - строки с новым названием или позицией: (строка, название, позиция)
+class ImageDiff(NamedTuple):
+    added: List[Tuple[int, ImageSchema]]
+    removed: List[StoredImage]
+    changed: List[Tuple[StoredImage, str, int]]
+
+
+def diff_images(stored: Sequence[StoredImage], images: Sequence[ImageSchema]) -> ImageDiff:
+    """Разница между изображениями в БД и переданными, по (url, title) и порядку.
+
+    Позиция изображения - его индекс в переданном списке. Совпавшие пары сохраняют свои строки;
+    изображение с известным url, но другим названием переименовывается; строка, у которой изменились
+    название или позиция, попадает в changed. Остальные переданные добавляются, а оставшиеся в БД
+    удаляются. Повторы url учитываются поштучно.
+    """
+    by_url: Dict[str, List[StoredImage]] = defaultdict(list)
+    for image in stored:
+        by_url[image.url].append(image)
+
+    # Сначала точные совпадения, чтобы переименование не забрало изображение, которое не менялось
+    matches: List[Optional[StoredImage]] = []
+    for image in images:
+        candidates = by_url.get(image.url)
+        match = next((row for row in candidates if row.title == image.title), None) if candidates else None
+        if match is not None:
+            candidates.remove(match)
+        matches.append(match)
+
+    added, changed = [], []
+    for position, (image, match) in enumerate(zip(images, matches)):
+        if match is None:
+            candidates = by_url.get(image.url)
+            if not candidates:
+                added.append((position, image))
+                continue
+            match = candidates.pop(0)
+        if match.title != image.title or match.position != position:
+            changed.append((match, image.title, position))
+
+    removed = sorted((row for rows in by_url.values() for row in rows), key=lambda row: row.id)
+    return ImageDiff(added, removed, changed)
@@ -0,0 +1,107 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import select, update, func, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.core.config import settings
+from src.core.context import traced_service
+from src.db.notify import pereval_notify_expression
+from src.models import PerevalAdded, Status
+from src.schemas.submit import ModerationClaimResponse, ModerationReleaseResponse
+from src.services.db_service import pereval_cache
+from src.services.read_service import PerevalReader
+
+logger = logging.getLogger("my_app")
+
+
+@traced_service
+class ModerationService:
+    """Очередь модерации: модераторы забирают новые перевалы пачками, не мешая друг другу.
+
+    Забранный перевал переходит в статус pending до claim_expires_at. Строки, которые сейчас забирает
+    другой модератор, пропускаются (FOR UPDATE SKIP LOCKED), поэтому параллельные выдачи не пересекаются
+    и не ждут друг друга. Перевалы с истекшим сроком проверки возвращаются в очередь.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _execute_changes(self, changed, event: str) -> List[int]:
+        """Выполнение UPDATE ... RETURNING id с уведомлением по каждому измененному перевалу."""
+        changed = changed.returning(PerevalAdded.id).cte("changed_perevals")
+        query = select(changed.c.id, pereval_notify_expression(changed.c.id, event))
+        return [row.id for row in (await self.db.execute(query)).all()]
+
+    async def _reclaim_expired(self, now: datetime) -> List[int]:
+        expired = aliased(PerevalAdded, name="expired")
+        expired_ids = (
+            select(expired.id)
+            .where(expired.status == Status.pending, expired.claim_expires_at < now)
+            .with_for_update(skip_locked=True)
+        )
+        return await self._execute_changes(
+            update(PerevalAdded)
+            .where(PerevalAdded.id.in_(expired_ids))
+            .values(status=Status.new, claimed_by=None, claim_expires_at=None, updated_at=now,
+                    version=PerevalAdded.version + 1),
+            "status"
+        )
+
+    async def claim(self, moderator: str, limit: int) -> ModerationClaimResponse:
+        """Выдача модератору до limit самых старых новых перевалов."""
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=settings.moderation_lease_seconds)
+
+        async with self.db.begin():
+            reclaimed = await self._reclaim_expired(now)
+
+            # Самые старые новые перевалы по частичному индексу, без строк, заблокированных другими выдачами
+            queued = aliased(PerevalAdded, name="queued")
+            queued_ids = (
+                select(queued.id)
+                .where(queued.status == Status.new)
+                .order_by(queued.add_time, queued.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            claimed = await self._execute_changes(
+                update(PerevalAdded)
+                .where(PerevalAdded.id.in_(queued_ids))
+                .values(status=Status.pending, claimed_by=moderator, claim_expires_at=expires_at, updated_at=now,
+                        version=PerevalAdded.version + 1),
+                "status"
+            )
+            perevals = await PerevalReader(self.db).get_perevals_by_ids(claimed) if claimed else []
+
+        for pereval_id in (*reclaimed, *claimed):
+            pereval_cache.invalidate(pereval_id)
+
+        logger.info(
+            "Модератор %s забрал перевалов: %s (возвращено в очередь: %s)", moderator, len(claimed), len(reclaimed)
+        )
+        return ModerationClaimResponse(moderator=moderator, claim_expires_at=expires_at, perevals=perevals)
+
+    async def release(self, moderator: str, pereval_ids: List[int]) -> ModerationReleaseResponse:
+        """Возврат в очередь непроверенных перевалов, забранных этим модератором."""
+        async with self.db.begin():
+            released = await self._execute_changes(
+                update(PerevalAdded)
+                .where(
+                    PerevalAdded.id == func.any(literal(pereval_ids, ARRAY(Integer))),
+                    PerevalAdded.status == Status.pending,
+                    PerevalAdded.claimed_by == moderator
+                )
+                .values(status=Status.new, claimed_by=None, claim_expires_at=None, updated_at=datetime.now(),
+                        version=PerevalAdded.version + 1),
+                "status"
+            )
+
+        for pereval_id in released:
+            pereval_cache.invalidate(pereval_id)
+
+        logger.info("Модератор %s вернул в очередь перевалов: %s", moderator, len(released))
+        return ModerationReleaseResponse(released=sorted(released))
@@ -0,0 +1,62 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+
+from src.models import PerevalAdded, Status
+
+Row = TypeVar("Row")
+
+
+# Курсор для keyset-пагинации: позиция последней отданной записи (add_time, id)
+def encode_cursor(add_time: datetime, pereval_id: int) -> str:
+    payload = json.dumps({"t": add_time.isoformat(), "id": pereval_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), int(payload["id"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор пагинации")
+
+
+def paginate_perevals(
+    query: Select,
+    limit: int,
+    cursor: Optional[str] = None,
+    status: Optional[Status] = None,
+    add_time_from: Optional[datetime] = None,
+    add_time_to: Optional[datetime] = None,
+) -> Select:
+    """Сортировка от новых к старым, фильтры и условие keyset-пагинации для запроса перевалов."""
+    query = query.order_by(
+        PerevalAdded.add_time.desc(),
+        PerevalAdded.id.desc()
+    ).limit(limit + 1)  # Лишняя запись показывает, есть ли следующая страница
+
+    if status:
+        query = query.where(PerevalAdded.status == status)
+    if add_time_from:
+        query = query.where(PerevalAdded.add_time >= add_time_from)
+    if add_time_to:
+        query = query.where(PerevalAdded.add_time <= add_time_to)
+    if cursor:
+        cursor_time, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(PerevalAdded.add_time, PerevalAdded.id) < tuple_(cursor_time, cursor_id))
+
+    return query
+
+
+def split_page(rows: Sequence[Row], limit: int) -> Tuple[Sequence[Row], Optional[str]]:
+    """Страница из limit записей и курсор следующей страницы, если она есть."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].add_time, rows[-1].id)
@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Select, select, func, literal_column, type_coerce, or_, JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.context import traced_service
+from src.core.serialization import dump_json
+from src.models import User, Coords, PerevalAdded, PerevalImages, Level, Status
+from src.services.geo import bounding_box, haversine_km
+from src.services.pagination import paginate_perevals, split_page
+
+
+@traced_service
+class PerevalReader:
+    """Чтение перевалов без ORM: выбираются только нужные колонки, а строки результата
+    сразу превращаются в словари ответа, минуя загрузку сущностей и повторную валидацию pydantic.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _query() -> Select:
+        # Изображения собираются в JSON-массив на стороне БД, без отдельного запроса
+        images = select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(
+                    func.json_build_object("url", PerevalImages.image_url, "title", PerevalImages.title),
+                    PerevalImages.position, PerevalImages.id
+                )),
+                literal_column("'[]'::json")
+            )
+        ).where(PerevalImages.pereval_id == PerevalAdded.id).scalar_subquery()
+
+        return (
+            select(
+                PerevalAdded.id,
+                PerevalAdded.status,
+                PerevalAdded.beauty_title,
+                PerevalAdded.title,
+                PerevalAdded.other_titles,
+                PerevalAdded.connect,
+                PerevalAdded.add_time,
+                PerevalAdded.updated_at,
+                PerevalAdded.version,
+                User.fam,
+                User.name,
+                User.otc,
+                User.email,
+                User.phone,
+                Coords.latitude,
+                Coords.longitude,
+                Coords.height,
+                Level.winter,
+                Level.summer,
+                Level.autumn,
+                Level.spring,
+                type_coerce(images, JSON).label("images"),
+            )
+            .join(PerevalAdded.user)
+            .join(PerevalAdded.coords)
+            .join(PerevalAdded.level)
+        )
+
+    @staticmethod
+    def _to_dict(row: Row, message: str) -> Dict[str, Any]:
+        return {
+            "message": message,
+            "share_link": f"http://{settings.app_host}:{settings.app_port}/submit/get/{row.id}",
+            "status": row.status.value,
+            "beauty_title": row.beauty_title,
+            "title": row.title,
+            "other_titles": row.other_titles,
+            "connect": row.connect,
+            "add_time": row.add_time,
+            "updated_at": row.updated_at,
+            "version": row.version,
+            "user": {
+                "fam": row.fam,
+                "name": row.name,
+                "otc": row.otc,
+                "email": row.email,
+                "phone": row.phone,
+            },
+            "coords": {
+                "latitude": row.latitude,
+                "longitude": row.longitude,
+                "height": row.height,
+            },
+            "level": {
+                "winter": row.winter,
+                "summer": row.summer,
+                "autumn": row.autumn,
+                "spring": row.spring,
+            },
+            "images": row.images,
+        }
+
+    async def _fetch(self, query: Select) -> List[Row]:
+        # Запрос выполняется через соединение сессии, без ORM-слоя
+        connection = await self.db.connection()
+        result = await connection.execute(query)
+        return result.all()
+
+    async def get_pereval(self, pereval_id: int) -> Dict[str, Any]:
+        rows = await self._fetch(self._query().where(PerevalAdded.id == pereval_id))
+
+        if not rows:
+            raise HTTPException(status_code=404, detail="Перевал не найден")
+
+        return self._to_dict(rows[0], "Данные перевала")
+
+    async def get_all_perevals(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[Status] = None,
+        add_time_from: Optional[datetime] = None,
+        add_time_to: Optional[datetime] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        query = paginate_perevals(self._query(), limit, cursor, status, add_time_from, add_time_to)
+        rows, next_cursor = split_page(await self._fetch(query), limit)
+
+        if not rows:
+            raise HTTPException(status_code=404, detail="Перевалы не найдены")
+
+        return [self._to_dict(row, "Данные перевалов") for row in rows], next_cursor
+
+    async def get_perevals_by_user_email(self, email: str) -> List[Dict[str, Any]]:
+        rows = await self._fetch(self._query().where(User.email == email))
+        return [self._to_dict(row, "Данные перевала") for row in rows]
+
+    async def get_perevals_by_ids(self, pereval_ids: List[int]) -> List[Dict[str, Any]]:
+        """Перевалы с заданными ID в порядке поступления."""
+        query = self._query().where(PerevalAdded.id.in_(pereval_ids)).order_by(PerevalAdded.add_time, PerevalAdded.id)
+        return [self._to_dict(row, "Данные перевала") for row in await self._fetch(query)]
+
+    async def get_nearby_perevals(self, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
+        """Перевалы в радиусе radius_km от точки, от ближних к дальним.
+
+        Кандидаты отбираются в БД по ограничивающему прямоугольнику (индекс по широте и долготе),
+        для них читаются только ID и координаты, а точное расстояние считается по формуле гаверсинусов.
+        Полные данные загружаются вторым запросом только для limit ближайших перевалов.
+        """
+        min_lat, max_lat, lon_ranges = bounding_box(lat, lon, radius_km)
+        candidates = (
+            select(PerevalAdded.id, Coords.latitude, Coords.longitude)
+            .join(PerevalAdded.coords)
+            .where(
+                Coords.latitude.between(min_lat, max_lat),
+                or_(*(Coords.longitude.between(min_lon, max_lon) for min_lon, max_lon in lon_ranges))
+            )
+        )
+
+        nearby = []
+        for row in await self._fetch(candidates):
+            distance = haversine_km(lat, lon, row.latitude, row.longitude)
+            if distance <= radius_km:
+                nearby.append((distance, row.id))
+        nearby = sorted(nearby)[:limit]
+        if not nearby:
+            return []
+
+        query = self._query().where(PerevalAdded.id.in_([pereval_id for _, pereval_id in nearby]))
+        rows = {row.id: row for row in await self._fetch(query)}
+
+        # Перевал, удаленный между запросами, пропускается
+        return [
+            {**self._to_dict(rows[pereval_id], "Данные перевала"), "distance_km": round(distance, 3)}
+            for distance, pereval_id in nearby if pereval_id in rows
+        ]
+
+    async def export_perevals(self) -> AsyncIterator[bytes]:
+        """Потоковая выгрузка всех перевалов в формате NDJSON через серверный курсор."""
+        query = self._query().order_by(PerevalAdded.id).execution_options(yield_per=settings.export_batch_size)
+
+        connection = await self.db.connection()
+        result = await connection.stream(query)
+        async for partition in result.partitions():
+            yield b"".join(dump_json(self._to_dict(row, "Данные перевала")) + b"\n" for row in partition)
@@ -1,7 +1,11 @@
 import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.cache import LRUCache
+from src.core.config import settings
 from src.models import User
 from src.schemas.submit import UserSchema
 from fastapi import HTTPException
@@ -13,41 +17,80 @@ class InvalidUserDataError(Exception):
     pass
 
 
-# Функция для создания или получения пользователя
-async def get_or_create_user(db: AsyncSession, user_data: UserSchema) -> User:
-    query = select(User).where(User.email == user_data.email)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
-
-    if not user:
-        # Если пользователя с таким email нет, создаем нового
-        user = User(
-            fam=user_data.fam,
-            name=user_data.name,
-            otc=user_data.otc,
-            email=user_data.email,
-            phone=user_data.phone
+# Данные пользователя, нужные при отправке перевала
+class UserRecord(NamedTuple):
+    id: int
+    email: str
+    fam: str
+    name: str
+    otc: str
+    phone: str
+
+
+# Кэш email -> UserRecord. ФИО пользователя после создания не меняются, поэтому записи не устаревают.
+# Заполняется только через remember_users после COMMIT: пользователь, созданный в откаченной
+# транзакции, в кэш не попадает.
+user_cache = LRUCache(settings.user_cache_size, settings.user_cache_ttl)
+
+
+def _to_record(user) -> UserRecord:
+    return UserRecord(user.id, user.email, user.fam, user.name, user.otc, user.phone)
+
+
+def get_cached_user(email: str) -> Optional[UserRecord]:
+    return user_cache.get(email)
+
+
+# Вызывается после COMMIT транзакции, в которой пользователи могли быть созданы
+def remember_users(users: Iterable[UserRecord]) -> None:
+    for user in users:
+        user_cache.set(user.email, user)
+
+
+def check_user_fio(user: UserRecord, user_data: UserSchema) -> None:
+    """Ошибка 400, если под email пользователя уже записаны другие ФИО."""
+    if (user.fam, user.name, user.otc) != (user_data.fam, user_data.name, user_data.otc):
+        logger.info("Пользователь с email %s найден, но ФИО не совпадают.", user.email)
+        logger.info("ФИО в базе: %s %s %s", user.fam, user.name, user.otc)
+        logger.info("Переданные ФИО: %s %s %s", user_data.fam, user_data.name, user_data.otc)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Под данным email {user.email} уже есть другие ФИО: {user.fam} {user.name} {user.otc}"
         )
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        logger.info(
-            f"Создан новый пользователь с email: {user.email.encode('utf-8', 'ignore').decode('utf-8')}"
+
+
+# Пакетное получение или создание пользователей: один SELECT и один многострочный INSERT
+async def get_or_create_users(db: AsyncSession, users_data: List[UserSchema]) -> Dict[str, UserRecord]:
+    emails = {user_data.email for user_data in users_data}
+    users = {email: user for email in emails if (user := get_cached_user(email)) is not None}
+
+    missing = emails - users.keys()
+    if missing:
+        result = await db.execute(select(User).where(User.email.in_(missing)))
+        users.update({user.email: _to_record(user) for user in result.scalars().all()})
+
+    # Для новых email берем данные из первого упоминания в пакете
+    new_users = {}
+    for user_data in users_data:
+        if user_data.email not in users and user_data.email not in new_users:
+            new_users[user_data.email] = user_data.model_dump()
+
+    if new_users:
+        query = (
+            insert(User)
+            .values(list(new_users.values()))
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
         )
-    else:
-        # Если пользователь найден и ФИО отличаются
-        if (user.fam != user_data.fam or
-            user.name != user_data.name or
-                user.otc != user_data.otc):
-            logger.info(f"Пользователь с email {user.email} найден, но ФИО не совпадают.")
-            logger.info(f"ФИО в базе: {user.fam} {user.name} {user.otc}")
-            logger.info(f"Переданные ФИО: {user_data.fam} {user_data.name} {user_data.otc}")
-            # Возвращаем ошибку в API с сообщением о несоответствии ФИО
-            raise HTTPException(
-                status_code=400,
-                detail=f"Под данным email {user.email} уже есть другие ФИО: {user.fam} {user.name} {user.otc}"
-            )
-        else:
-            logger.info(f"Пользователь с email {user.email} найден и данные совпадают")
-
-    return user
+        result = await db.execute(query)
+        created = result.scalars().all()
+        users.update({user.email: _to_record(user) for user in created})
+        logger.info("Создано новых пользователей: %s", len(created))
+
+        # Пользователи, созданные параллельным запросом между SELECT и INSERT
+        missing = emails - users.keys()
+        if missing:
+            result = await db.execute(select(User).where(User.email.in_(missing)))
+            users.update({user.email: _to_record(user) for user in result.scalars().all()})
+
+    return users
@@ -0,0 +1,78 @@
+import argparse
+
+import httpx
+import pytest
+
+from benchmarks.load import BenchmarkState, drive, op_status, parse_mix, percentile, summarize
+
+
+def test_parse_mix():
+    assert parse_mix("create=1,get=6,list") == {"create": 1.0, "get": 6.0, "list": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("delete=1")
+
+
+def test_summarize_percentiles():
+    """
+    Тест проверяет расчет перцентилей и пропускной способности по операциям.
+    """
+    run = {
+        "elapsed": 2.0,
+        "latencies": {"get": [float(ms) for ms in range(1, 101)], "list": []},
+        "errors": {"get": 1, "list": 0},
+    }
+
+    result = summarize(run)
+
+    assert result["requests"] == 100
+    assert result["rps"] == 50.0
+    assert result["routes"]["get"]["p50_ms"] == 50.0
+    assert result["routes"]["get"]["p95_ms"] == 95.0
+    assert result["routes"]["get"]["p99_ms"] == 99.0
+    assert result["routes"]["get"]["errors"] == 1
+    assert result["routes"]["list"]["p99_ms"] is None
+    assert percentile([5.0], 99) == 5.0
+
+
+def bench_client() -> httpx.AsyncClient:
+    # Ответы API без сервера: создание возвращает новый перевал, остальные запросы успешны
+    created = iter(range(1, 1000))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return httpx.Response(200, json={"user": {}, "share_link": f"http://testserver/submit/get/{next(created)}"})
+        return httpx.Response(200, json={})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://testserver")
+
+
+@pytest.mark.asyncio
+async def test_drive_empty_state():
+    """
+    Тест проверяет, что без перевалов и email операции заменяются созданием перевала, а не прерывают замер.
+    """
+    state = BenchmarkState("test", [], [], [])
+
+    async with bench_client() as client:
+        run = await drive(client, state, {"get": 1, "by_user": 1, "patch": 1}, concurrency=2, duration=10, requests=20)
+
+    assert sum(len(values) for values in run["latencies"].values()) == 20
+    assert run["latencies"]["create"]
+    assert not any(run["errors"].values())
+    assert state.pereval_ids
+
+
+@pytest.mark.asyncio
+async def test_status_leaves_new_ids():
+    """
+    Тест проверяет, что перевал после смены статуса больше не выбирается для patch.
+    """
+    state = BenchmarkState("test", [1], [1], [])
+
+    async with bench_client() as client:
+        response = await op_status(client, state)
+
+    assert response.status_code == 200
+    assert state.new_ids == []
+    assert not state.has_targets("patch")
+
@@ -0,0 +1,40 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_status(transaction, create_pereval):
+    """
+    Тест проверяет массовую смену статуса: результат по каждому ID различает обновленные,
+    ненайденные и уже промодерированные перевалы.
+    """
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        pereval_ids = []
+        for _ in range(3):
+            response = await client.post("/submit/submitData", json=create_pereval())
+            assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+            pereval_ids.append(int(response.json()["share_link"].split("/")[-1]))
+
+        response = await client.patch(f"/submit/submitData/update-status/{pereval_ids[0]}?status=rejected")
+        assert response.status_code == 200
+
+        response = await client.patch(
+            "/submit/submitData/update-status", json={"ids": [*pereval_ids, 0, pereval_ids[1]], "status": "accepted"}
+        )
+        assert response.status_code == 200
+        assert response.json() == [
+            {"id": pereval_ids[0], "result": "moderated"},
+            {"id": pereval_ids[1], "result": "updated"},
+            {"id": pereval_ids[2], "result": "updated"},
+            {"id": 0, "result": "not_found"},
+        ]
+
+        for pereval_id, status in zip(pereval_ids, ("rejected", "accepted", "accepted")):
+            response = await client.get(f"/submit/submitData/{pereval_id}")
+            assert response.json()["status"] == status
+            assert response.json()["version"] == 2
+
+        response = await client.patch("/submit/submitData/update-status", json={"ids": [], "status": "accepted"})
+        assert response.status_code == 422
@@ -0,0 +1,48 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from main import app
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_pereval(transaction, create_pereval):
+    """
+    Тест проверяет ответ 304 на If-None-Match и смену ETag после изменения статуса.
+    """
+    submit_data = create_pereval()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=submit_data)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        pereval_id = response.json()["share_link"].split("/")[-1]
+        by_user_url = f"/submit/submitData/by_user/?user__email={submit_data['user']['email']}"
+
+        response_get = await client.get(f"/submit/submitData/{pereval_id}")
+        assert response_get.status_code == 200
+        etag = response_get.headers["ETag"]
+        assert response_get.headers["Last-Modified"]
+
+        response_list = await client.get(by_user_url)
+        assert response_list.status_code == 200
+        list_etag = response_list.headers["ETag"]
+
+        # Данные не менялись - тело не передается
+        response_get = await client.get(f"/submit/submitData/{pereval_id}", headers={"If-None-Match": etag})
+        assert response_get.status_code == 304
+        assert response_get.content == b""
+        assert response_get.headers["ETag"] == etag
+
+        response_list = await client.get(by_user_url, headers={"If-None-Match": list_etag})
+        assert response_list.status_code == 304
+
+        # После смены статуса версия меняется
+        response_patch = await client.patch(f"/submit/submitData/update-status/{pereval_id}?status=accepted")
+        assert response_patch.status_code == 200
+
+        response_get = await client.get(f"/submit/submitData/{pereval_id}", headers={"If-None-Match": etag})
+        assert response_get.status_code == 200
+        assert response_get.json()["status"] == "accepted"
+        assert response_get.headers["ETag"] != etag
+
+        response_list = await client.get(by_user_url, headers={"If-None-Match": list_etag})
+        assert response_list.status_code == 200
+        assert response_list.headers["ETag"] != list_etag
@@ -0,0 +1,29 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from main import app
+from src.db.db import engine
+
+
+@pytest.mark.asyncio
+async def test_create_pereval_round_trips(transaction, create_pereval):
+    """
+    Тест проверяет, что создание перевала выполняется одним запросом к базе данных.
+    """
+    submit_data = create_pereval()
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            response = await client.post("/submit/submitData", json=submit_data)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+    assert response.json()["message"] == "Данные успешно отправлены"
+    assert len(statements) == 1, f"Expected a single statement, got {len(statements)}: {statements}"
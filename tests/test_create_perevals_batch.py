@@ -0,0 +1,43 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from main import app
+
+
+@pytest.mark.asyncio
+async def test_create_perevals_batch(transaction, create_pereval):
+    """
+    Тест проверяет пакетное создание перевалов и результат по каждому элементу.
+    """
+    existing = create_pereval()
+    first, second = create_pereval(), create_pereval()
+
+    # Дубликат по названию внутри пакета
+    in_batch_duplicate = {**create_pereval(), "title": first["title"]}
+    # Дубликат уже существующего перевала
+    existing_duplicate = {**create_pereval(), "title": existing["title"]}
+    # Тот же email, что и у первого перевала, но другие ФИО
+    wrong_user = {**create_pereval(), "user": {**first["user"], "fam": first["user"]["fam"] + "ов"}}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=existing)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        existing_link = response.json()["share_link"]
+
+        batch = [first, second, in_batch_duplicate, existing_duplicate, wrong_user]
+        response_batch = await client.post("/submit/submitData/batch", json=batch)
+        assert response_batch.status_code == 200, f"Failed to create batch: {response_batch.text}"
+
+        result = response_batch.json()
+        assert [item["index"] for item in result] == list(range(len(batch)))
+        assert [item["result"] for item in result] == ["created", "created", "duplicate", "duplicate", "error"]
+        assert result[2]["share_link"] == result[0]["share_link"]
+        assert result[3]["share_link"] == existing_link
+
+        # Созданные перевалы доступны по своим ссылкам
+        for item, submit_data in zip(result[:2], batch[:2]):
+            pereval_id = item["share_link"].split("/")[-1]
+            response_get = await client.get(f"/submit/submitData/{pereval_id}")
+            assert response_get.status_code == 200
+            pereval_data = response_get.json()
+            assert pereval_data["title"] == submit_data["title"]
+            assert pereval_data["images"] == submit_data["images"]
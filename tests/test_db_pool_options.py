@@ -0,0 +1,60 @@
+from src.core.config import settings
+from src.db.db import connect_args, pool_options
+
+
+def test_pool_options_from_connection_budget(monkeypatch):
+    """
+    Тест проверяет, что пул воркера выводится из общего бюджета соединений.
+    """
+    monkeypatch.setattr(settings, "cpu_count", 32)
+    monkeypatch.setattr(settings, "db_max_connections", 200)
+    monkeypatch.setattr(settings, "pereval_notify_enabled", True)
+
+    options = pool_options()
+    # 200 // 32 = 6 соединений на воркер, одно из них у слушателя уведомлений
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 0
+
+    monkeypatch.setattr(settings, "db_pool_size", 3)
+    options = pool_options()
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 2
+    assert options["pool_size"] + options["max_overflow"] + 1 <= 200 // 32
+
+
+def test_pool_options_defaults(monkeypatch):
+    monkeypatch.setattr(settings, "db_max_connections", None)
+    monkeypatch.setattr(settings, "db_pool_size", None)
+    monkeypatch.setattr(settings, "db_max_overflow", None)
+
+    options = pool_options()
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 10
+
+
+def test_connect_args_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    args = connect_args()
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+
+    monkeypatch.setattr(settings, "db_pgbouncer", False)
+    assert connect_args() == {"statement_cache_size": settings.db_statement_cache_size}
+
+
+def test_listen_dsn_pgbouncer(monkeypatch):
+    """
+    Тест проверяет, что с PgBouncer слушатель уведомлений подключается только напрямую к PostgreSQL.
+    """
+    monkeypatch.setattr(settings, "fstr_db_listen_host", None)
+    monkeypatch.setattr(settings, "db_pgbouncer", False)
+    assert settings.listen_dsn == settings.asyncpg_dsn
+
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    assert settings.listen_dsn is None
+
+    monkeypatch.setattr(settings, "fstr_db_listen_host", "db-direct")
+    monkeypatch.setattr(settings, "fstr_db_listen_port", 5433)
+    assert "@db-direct:5433/" in settings.listen_dsn
+
@@ -0,0 +1,71 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.db.db import async_session_null_pool
+from src.models import Coords
+
+
+@pytest.mark.asyncio
+async def test_duplicate_detection(transaction, create_pereval):
+    """
+    Тест проверяет поиск дубликатов по нормализованному названию и округленным координатам
+    при создании и обновлении перевала. Координаты занимает и строка coords без перевала,
+    как в уникальном индексе coord_key.
+    """
+    original = create_pereval()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=original)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        share_link = response.json()["share_link"]
+
+        # Название отличается только регистром и пробелами
+        same_title = create_pereval()
+        same_title["title"] = f"  {original['title'].upper()}  ".replace(" ", "   ")
+        response = await client.post("/submit/submitData", json=same_title)
+        assert response.status_code == 200
+        assert response.json()["state"] == 0
+        assert response.json()["share_link"] == share_link
+
+        # Координаты отличаются меньше чем на 1e-6 градуса
+        same_coords = create_pereval()
+        same_coords["coords"] = {**original["coords"], "latitude": original["coords"]["latitude"] + 1e-8}
+        response = await client.post("/submit/submitData", json=same_coords)
+        assert response.status_code == 200
+        assert response.json()["state"] == 0
+        assert response.json()["share_link"] == share_link
+
+        # Обновление другого перевала на занятое название
+        other = create_pereval()
+        response = await client.post("/submit/submitData", json=other)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        other_id = response.json()["share_link"].split("/")[-1]
+
+        update = {key: other[key] for key in ("beauty_title", "title", "other_titles", "connect", "coords", "level", "images")}
+        update["title"] = original["title"].lower()
+        response = await client.patch(f"/submit/submitData/{other_id}", json=update)
+        assert response.status_code == 200
+        assert response.json()["state"] == 0
+        assert response.json()["share_link"] == share_link
+
+        # Собственные название и координаты перевала дубликатом не считаются
+        update["title"] = other["title"]
+        response = await client.patch(f"/submit/submitData/{other_id}", json=update)
+        assert response.status_code == 200
+        assert response.json()["state"] == 1
+
+        # Строка coords без перевала: дубликат без ссылки, а не ошибка уникального индекса
+        orphan = create_pereval()["coords"]
+        async with async_session_null_pool() as session:
+            session.add(Coords(**orphan))
+            await session.commit()
+
+        response = await client.post("/submit/submitData", json={**create_pereval(), "coords": orphan})
+        assert response.status_code == 200, response.text
+        assert response.json()["state"] == 0
+        assert response.json()["share_link"] == ""
+
+        response = await client.patch(f"/submit/submitData/{other_id}", json={"coords": orphan})
+        assert response.status_code == 200, response.text
+        assert response.json()["message"] == "Координаты уже заняты другим перевалом"
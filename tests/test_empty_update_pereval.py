@@ -0,0 +1,45 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from main import app
+from src.db import db
+
+
+@pytest.mark.asyncio
+async def test_empty_update_pereval(transaction, create_pereval):
+    """
+    Тест проверяет, что пустое изменение не записывает перевал: версия и ETag остаются прежними,
+    а UPDATE не выполняется.
+    """
+    submit_data = create_pereval()
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=submit_data)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        pereval_id = response.json()["share_link"].split("/")[-1]
+
+        response = await client.get(f"/submit/submitData/{pereval_id}")
+        etag = response.headers["ETag"]
+        version = response.json()["version"]
+
+        event.listen(db.engine.sync_engine, "before_cursor_execute", count_statement)
+        try:
+            for patch in ({}, {"coords": {}, "level": {}, "images": []}):
+                response = await client.patch(f"/submit/submitData/{pereval_id}", json=patch, headers={"If-Match": etag})
+                assert response.status_code == 200
+                assert response.json()["state"] == 1, response.json()
+                assert response.json()["version"] == version
+                assert response.headers["ETag"] == etag
+        finally:
+            event.remove(db.engine.sync_engine, "before_cursor_execute", count_statement)
+        assert not [statement for statement in statements if statement.lstrip().upper().startswith(("UPDATE", "WITH"))], statements
+
+        response = await client.get(f"/submit/submitData/{pereval_id}")
+        assert response.headers["ETag"] == etag
+        assert response.json()["version"] == version
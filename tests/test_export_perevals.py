@@ -0,0 +1,30 @@
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from main import app
+
+
+@pytest.mark.asyncio
+async def test_export_perevals(transaction, create_pereval):
+    """
+    Тест проверяет потоковую выгрузку перевалов в формате NDJSON.
+    """
+    submit_data = create_pereval()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=submit_data)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        share_link = response.json()["share_link"]
+
+        response_export = await client.get("/submit/submitData/export")
+        assert response_export.status_code == 200, f"Failed to export perevals: {response_export.text}"
+        assert response_export.headers["content-type"].startswith("application/x-ndjson")
+
+        # Каждая строка - отдельный JSON-объект перевала
+        exported = [json.loads(line) for line in response_export.text.splitlines()]
+        created = next((item for item in exported if item["share_link"] == share_link), None)
+        assert created is not None, "Created pereval is missing from the export"
+        assert created["title"] == submit_data["title"]
+        assert created["user"]["email"] == submit_data["user"]["email"]
+        assert created["images"] == submit_data["images"]
@@ -0,0 +1,35 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.core.config import settings
+
+
+@pytest.mark.asyncio
+async def test_fast_read_path(transaction, create_pereval, monkeypatch):
+    """
+    Тест проверяет, что чтение без ORM возвращает те же данные, что и через ORM.
+    """
+    submit_data = create_pereval()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=submit_data)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        pereval_id = response.json()["share_link"].split("/")[-1]
+
+        urls = [
+            f"/submit/submitData/{pereval_id}",
+            "/submit/submitData/?limit=5",
+            f"/submit/submitData/by_user/?user__email={submit_data['user']['email']}",
+        ]
+
+        orm_responses = [await client.get(url) for url in urls]
+
+        monkeypatch.setattr(settings, "fast_read_endpoints", ["get_pereval", "get_all_perevals", "get_perevals_by_user_email"])
+        fast_responses = [await client.get(url) for url in urls]
+
+        for url, orm_response, fast_response in zip(urls, orm_responses, fast_responses):
+            assert orm_response.status_code == fast_response.status_code == 200, url
+            assert orm_response.json() == fast_response.json(), url
+            assert orm_response.headers.get("ETag") == fast_response.headers.get("ETag"), url
+            assert orm_response.headers.get("X-Next-Cursor") == fast_response.headers.get("X-Next-Cursor"), url
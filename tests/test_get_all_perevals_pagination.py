@@ -0,0 +1,46 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from main import app
+
+
+@pytest.mark.asyncio
+async def test_get_all_perevals_pagination(transaction, create_pereval):
+    """
+    Тест проверяет постраничную выдачу перевалов по курсору и фильтр по статусу.
+    """
+    submit_data_list = [create_pereval() for _ in range(3)]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        pereval_ids = []
+        for submit_data in submit_data_list:
+            response = await client.post("/submit/submitData", json=submit_data)
+            assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+            pereval_ids.append(response.json()["share_link"].split("/")[-1])
+
+        # Первая страница: два самых новых перевала и курсор на следующую
+        response_page = await client.get("/submit/submitData/", params={"limit": 2})
+        assert response_page.status_code == 200, f"Failed to get first page: {response_page.text}"
+        first_page = response_page.json()
+        assert [item["title"] for item in first_page] == [submit_data_list[2]["title"], submit_data_list[1]["title"]]
+
+        next_cursor = response_page.headers.get("X-Next-Cursor")
+        assert next_cursor, "First page does not contain X-Next-Cursor header"
+
+        # Следующая страница начинается с самого раннего из созданных перевалов
+        response_page = await client.get("/submit/submitData/", params={"limit": 2, "cursor": next_cursor})
+        assert response_page.status_code == 200, f"Failed to get next page: {response_page.text}"
+        assert response_page.json()[0]["title"] == submit_data_list[0]["title"]
+
+        # Некорректный курсор
+        response_page = await client.get("/submit/submitData/", params={"cursor": "not-a-cursor"})
+        assert response_page.status_code == 400
+
+        # Фильтр по статусу
+        response_patch = await client.patch(f"/submit/submitData/update-status/{pereval_ids[0]}?status=accepted")
+        assert response_patch.status_code == 200
+
+        response_filtered = await client.get("/submit/submitData/", params={"status": "accepted", "limit": 1000})
+        assert response_filtered.status_code == 200
+        filtered = response_filtered.json()
+        assert all(item["status"] == "accepted" for item in filtered)
+        assert submit_data_list[0]["title"] in {item["title"] for item in filtered}
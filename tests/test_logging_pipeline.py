@@ -0,0 +1,80 @@
+import logging
+import queue
+from pathlib import Path
+
+import main  # noqa: F401  настраивает логирование при импорте
+from src.core import logger
+from src.core.logger import (
+    BatchingQueueListener, BufferedRotatingFileHandler, DroppingQueueHandler, SamplingFilter, setup_logging
+)
+
+
+def _record(name: str, level: int, msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, msg, args, None)
+
+
+def test_single_queue_handler_on_root():
+    """
+    Тест проверяет, что корневой логгер пишет только в одну очередь, даже при повторной настройке.
+    """
+    setup_logging()
+    # Обработчики, которые pytest добавляет на время теста, не учитываются
+    handlers = [h for h in logging.getLogger().handlers if not type(h).__module__.startswith("_pytest")]
+    assert len(handlers) == 1
+    assert isinstance(handlers[0], DroppingQueueHandler)
+
+
+def test_slow_queries_only_in_their_file():
+    """
+    Тест проверяет, что медленные запросы пишутся в slow_queries.log и не дублируются в my_app.log.
+    """
+    setup_logging()
+    files = {
+        Path(handler.baseFilename).name: handler
+        for handler in logger._listener.handlers if isinstance(handler, BufferedRotatingFileHandler)
+    }
+    slow = _record("my_app.slow_queries", logging.INFO, "slow")
+    regular = _record("my_app", logging.INFO, "regular")
+
+    assert not files["my_app.log"].filter(slow)
+    assert files["my_app.log"].filter(regular)
+    assert files["slow_queries.log"].filter(slow)
+    assert not files["slow_queries.log"].filter(regular)
+
+
+def test_dropping_queue_handler():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.handle(_record("my_app", logging.INFO, "record %s", i))
+
+    assert handler.enqueued == 2
+    assert handler.dropped == 3
+
+
+def test_sampling_filter(monkeypatch):
+    sampling = SamplingFilter({"my_app.hot": 0.0})
+
+    assert not sampling.filter(_record("my_app.hot", logging.INFO, "sampled out"))
+    assert not sampling.filter(_record("my_app.hot.child", logging.DEBUG, "sampled out"))
+    assert sampling.filter(_record("my_app.hot", logging.WARNING, "always kept"))
+    assert sampling.filter(_record("my_app", logging.INFO, "not sampled"))
+
+
+def test_batching_listener_writes_file(tmp_path):
+    log_file = tmp_path / "app.log"
+    file_handler = BufferedRotatingFileHandler(log_file, maxBytes=1024 * 1024, backupCount=1, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    log_queue = queue.Queue(100)
+    handler = DroppingQueueHandler(log_queue)
+    listener = BatchingQueueListener(log_queue, file_handler, batch_size=10)
+    listener.start()
+    try:
+        for i in range(25):
+            handler.handle(_record("my_app", logging.INFO, "Перевал %s", i))
+        log_queue.join()
+    finally:
+        listener.stop()
+        file_handler.close()
+
+    assert log_file.read_text(encoding="utf-8").splitlines() == [f"Перевал {i}" for i in range(25)]
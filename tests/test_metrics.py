@@ -0,0 +1,86 @@
+import subprocess
+import sys
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.core import metrics
+from src.core.config import settings
+from src.core.metrics import Registry, merge_snapshots, render_prometheus
+
+
+def test_merge_worker_snapshots():
+    """
+    Тест проверяет объединение метрик воркеров: счетчики и гистограммы суммируются,
+    показатели остановленных воркеров не учитываются.
+    """
+    snapshots = []
+    for requests, pool in ((3, 2), (5, 4)):
+        registry = Registry()
+        counter = registry.counter("requests_total", "Запросы", ("route",))
+        histogram = registry.histogram("latency_seconds", "Задержка", buckets=(0.1, 1.0))
+        gauge = registry.gauge("pool_connections", "Соединения")
+        counter.inc(requests, route="/a")
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        gauge.set(pool)
+        snapshots.append(registry.snapshot())
+
+    text = render_prometheus(merge_snapshots([(snapshots[0], True), (snapshots[1], False)]))
+
+    assert 'requests_total{route="/a"} 8.0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1.0"} 4' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+    assert "pool_connections 2.0" in text
+
+
+def test_stale_metrics_cleared(tmp_path, monkeypatch):
+    """
+    Тест проверяет, что снимки хранятся в каталоге запуска сервера, а каталоги
+    завершенных запусков удаляются при старте.
+    """
+    monkeypatch.setattr(settings, "metrics_dir", str(tmp_path))
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    stale = tmp_path / f"server-{finished.pid}"
+    stale.mkdir()
+    (stale / f"{finished.pid}-0.json").write_text("{}", encoding="utf-8")
+
+    metrics.prepare_metrics_dir()
+    metrics.write_snapshot(metrics.registry.snapshot())
+
+    assert not stale.exists()
+    assert [path.name for path in tmp_path.iterdir()] == [f"server-{metrics.server_pid()}"]
+    # Собственный снимок берется из памяти, а не из файла
+    assert metrics.read_snapshots() == []
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(transaction, create_pereval):
+    """
+    Тест проверяет, что /metrics отдает метрики маршрутов, SQL-запросов и пула соединений.
+    """
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=create_pereval())
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        pereval_id = response.json()["share_link"].split("/")[-1]
+
+        response = await client.get(f"/submit/submitData/{pereval_id}")
+        assert response.status_code == 200
+
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+
+    assert 'http_requests_total{method="POST",route="/submit/submitData",status="200"}' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/submit/submitData/{pereval_id}"}' in text
+    assert 'http_request_db_queries_count{route="/submit/submitData"}' in text
+    assert 'db_queries_total{engine="primary"}' in text
+    assert 'db_pool_checkout_seconds_count{engine="primary"}' in text
+    assert 'db_pool_connections{engine="primary",state="checked_out"}' in text
+    assert 'cache_requests_total{cache="user",result="miss"}' in text
+    assert 'log_records_total{result="dropped"}' in text
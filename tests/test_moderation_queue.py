@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.core.config import settings
+
+
+@pytest.mark.asyncio
+async def test_moderation_queue(transaction, create_pereval, monkeypatch):
+    """
+    Тест проверяет очередь модерации: параллельные выдачи не пересекаются, перевалы с истекшим сроком
+    возвращаются в очередь, а модератор может вернуть непроверенные перевалы сам.
+    """
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        for _ in range(4):
+            response = await client.post("/submit/submitData", json=create_pereval())
+            assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+
+        # Параллельные выдачи получают разные перевалы
+        first, second = await asyncio.gather(
+            client.post("/moderation/claim", json={"moderator": "first", "limit": 2}),
+            client.post("/moderation/claim", json={"moderator": "second", "limit": 2}),
+        )
+        assert first.status_code == second.status_code == 200
+        first_ids = [pereval["share_link"].split("/")[-1] for pereval in first.json()["perevals"]]
+        second_ids = [pereval["share_link"].split("/")[-1] for pereval in second.json()["perevals"]]
+        assert len(first_ids) == len(second_ids) == 2
+        assert not set(first_ids) & set(second_ids)
+        assert all(pereval["status"] == "pending" for pereval in first.json()["perevals"])
+
+        # Модератор возвращает непроверенный перевал; чужие перевалы он вернуть не может
+        response = await client.post(
+            "/moderation/release", json={"moderator": "first", "ids": [int(first_ids[0]), int(second_ids[0])]}
+        )
+        assert response.json() == {"released": [int(first_ids[0])]}
+        response = await client.get(f"/submit/submitData/{first_ids[0]}")
+        assert response.json()["status"] == "new"
+
+        # Срок проверки истек - перевалы возвращаются в очередь при следующей выдаче
+        monkeypatch.setattr(settings, "moderation_lease_seconds", -1)
+        response = await client.post("/moderation/claim", json={"moderator": "third", "limit": 1})
+        expired_id = response.json()["perevals"][0]["share_link"].split("/")[-1]
+        monkeypatch.undo()
+
+        response = await client.post("/moderation/claim", json={"moderator": "fourth", "limit": 1})
+        assert [pereval["share_link"].split("/")[-1] for pereval in response.json()["perevals"]] == [expired_id]
+
+        response = await client.post("/moderation/claim", json={"moderator": "fifth", "limit": settings.moderation_claim_max + 1})
+        assert response.status_code == 422
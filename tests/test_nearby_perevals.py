@@ -0,0 +1,64 @@
+import random
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.services.geo import bounding_box, haversine_km
+
+
+def test_bounding_box_antimeridian():
+    """
+    Тест проверяет, что прямоугольник у 180-го меридиана разбивается на два диапазона долготы.
+    """
+    min_lat, max_lat, lon_ranges = bounding_box(10.0, 179.95, 20)
+
+    assert min_lat < 10.0 < max_lat
+    assert len(lon_ranges) == 2
+    assert lon_ranges[0][1] == 180.0 and lon_ranges[1][0] == -180.0
+    assert haversine_km(10.0, 179.95, 10.0, -179.95) < 20
+
+
+def test_bounding_box_pole():
+    """
+    Тест проверяет, что вблизи полюса подходит любая долгота.
+    """
+    _, max_lat, lon_ranges = bounding_box(89.99, 0.0, 5)
+
+    assert max_lat == 90.0
+    assert lon_ranges == [(-180.0, 180.0)]
+
+
+@pytest.mark.asyncio
+async def test_get_nearby_perevals(transaction, create_pereval):
+    """
+    Тест проверяет поиск перевалов в радиусе от точки с сортировкой по расстоянию.
+    """
+    lat, lon = round(random.uniform(-60, 60), 4), round(random.uniform(-170, 170), 4)
+    offsets = {"center": 0.0, "near": 0.005, "far": 0.5}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        ids = {}
+        for name, offset in offsets.items():
+            submit_data = create_pereval()
+            submit_data["coords"]["latitude"] = lat + offset
+            submit_data["coords"]["longitude"] = lon
+            response = await client.post("/submit/submitData", json=submit_data)
+            assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+            ids[name] = response.json()["share_link"].split("/")[-1]
+
+        response = await client.get("/submit/submitData/nearby", params={"lat": lat, "lon": lon, "radius_km": 5})
+        assert response.status_code == 200, response.text
+        perevals = response.json()
+
+        found = [p["share_link"].split("/")[-1] for p in perevals]
+        assert found[:2] == [ids["center"], ids["near"]]
+        assert ids["far"] not in found
+        assert perevals[0]["distance_km"] == 0
+        assert perevals[1]["distance_km"] == pytest.approx(0.556, abs=0.01)
+
+        response = await client.get("/submit/submitData/nearby", params={"lat": lat, "lon": lon, "radius_km": 5, "limit": 1})
+        assert [p["share_link"].split("/")[-1] for p in response.json()] == [ids["center"]]
+
+        response = await client.get("/submit/submitData/nearby", params={"lat": 91, "lon": lon})
+        assert response.status_code == 422
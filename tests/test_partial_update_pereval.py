@@ -0,0 +1,59 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from main import app
+from src.db import db
+
+
+@pytest.mark.asyncio
+async def test_partial_update_pereval(transaction, create_pereval):
+    """
+    Тест проверяет частичное обновление: меняются только переданные поля (в том числе вложенные),
+    изменение без изображений выполняется одним запросом, а null и дубликаты отклоняются.
+    """
+    submit_data = create_pereval()
+    other_data = create_pereval()
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=submit_data)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        pereval_id = response.json()["share_link"].split("/")[-1]
+        response = await client.post("/submit/submitData", json=other_data)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+
+        patch = {"title": f"{submit_data['title']} (изм.)", "coords": {"height": 4321}, "level": {"winter": "1A"}}
+        event.listen(db.engine.sync_engine, "before_cursor_execute", count_statement)
+        try:
+            response = await client.patch(
+                f"/submit/submitData/{pereval_id}", json=patch, headers={"Content-Type": "application/merge-patch+json"}
+            )
+        finally:
+            event.remove(db.engine.sync_engine, "before_cursor_execute", count_statement)
+        assert response.status_code == 200
+        assert response.json()["state"] == 1, response.json()
+        assert response.json()["images"] is None
+        assert len(statements) == 1, statements
+
+        response = await client.get(f"/submit/submitData/{pereval_id}")
+        pereval = response.json()
+        assert pereval["title"] == patch["title"]
+        assert pereval["beauty_title"] == submit_data["beauty_title"]
+        assert pereval["connect"] == submit_data["connect"]
+        assert pereval["coords"] == {**submit_data["coords"], "height": 4321}
+        assert pereval["level"] == {**submit_data["level"], "winter": "1A"}
+        assert pereval["images"] == submit_data["images"]
+
+        response = await client.patch(f"/submit/submitData/{pereval_id}", json={"connect": None})
+        assert response.status_code == 422
+
+        response = await client.patch(f"/submit/submitData/{pereval_id}", json={"title": other_data["title"].upper()})
+        assert response.json()["message"] == "Перевал с таким названием уже существует"
+
+        response = await client.patch(f"/submit/submitData/{pereval_id}", json={"coords": other_data["coords"]})
+        assert response.json()["message"] == "Координаты уже заняты другим перевалом"
@@ -0,0 +1,62 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.core.cache import LRUCache
+from src.core.config import settings
+from src.services.db_service import pereval_cache
+
+
+def test_lru_cache_eviction_and_ttl():
+    now = [0.0]
+    cache = LRUCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set(1, "one")
+    cache.set(2, "two")
+    assert cache.get(1) == "one"  # 1 становится самым свежим
+
+    cache.set(3, "three")  # вытесняет 2
+    assert cache.get(2) is None
+    assert cache.get(3) == "three"
+
+    now[0] = 11
+    assert cache.get(1) is None  # истек срок жизни
+
+    # Значение, прочитанное до инвалидации, не попадает в кэш
+    generation = cache.generation()
+    cache.invalidate(3)
+    cache.set(3, "stale", generation)
+    assert cache.get(3) is None
+
+    assert cache.stats() == {
+        "size": 0, "maxsize": 2, "hits": 2, "misses": 3, "evictions": 1, "expirations": 1, "invalidations": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_pereval_cache_invalidation(transaction, create_pereval, monkeypatch):
+    monkeypatch.setattr(settings, "pereval_cache_enabled", True)
+    submit_data = create_pereval()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=submit_data)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        pereval_id = int(response.json()["share_link"].split("/")[-1])
+
+        hits = pereval_cache.hits
+        for _ in range(2):
+            response_get = await client.get(f"/submit/submitData/{pereval_id}")
+            assert response_get.status_code == 200
+            assert response_get.json()["status"] == "new"
+        assert pereval_cache.hits == hits + 1
+
+        # Изменение статуса сбрасывает запись в кэше
+        response_patch = await client.patch(f"/submit/submitData/update-status/{pereval_id}?status=pending")
+        assert response_patch.status_code == 200
+
+        response_get = await client.get(f"/submit/submitData/{pereval_id}")
+        assert response_get.json()["status"] == "pending"
+
+        response_stats = await client.get("/metrics/cache")
+        assert response_stats.status_code == 200
+        assert response_stats.json()["pereval"]["hits"] == pereval_cache.hits
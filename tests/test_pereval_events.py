@@ -0,0 +1,95 @@
+import asyncio
+
+import orjson
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.db.db import async_session_null_pool
+from src.services.event_feed import PerevalEventFeed
+
+
+async def next_event(stream, pereval_id: int):
+    """Следующее событие ленты для заданного перевала: (id события, тип события)."""
+    while True:
+        frame = await asyncio.wait_for(anext(stream), timeout=5)
+        fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n") if not line.startswith(":"))
+        if fields.get("event") == "reset":
+            return fields["id"], "reset"
+        if "data" in fields and orjson.loads(fields["data"])["id"] == pereval_id:
+            return fields["id"], fields["event"]
+
+
+@pytest.mark.asyncio
+async def test_pereval_events(transaction, create_pereval):
+    """
+    Тест проверяет ленту изменений: новые события приходят подписчику,
+    а после переподключения с Last-Event-ID пропущенные события отправляются из журнала.
+    """
+    feed = PerevalEventFeed(async_session_null_pool, poll_interval=0.1)
+    await feed.start()
+    stream = feed.stream()
+
+    try:
+        assert await anext(stream) == b"retry: 3000\n\n"
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            response = await client.post("/submit/submitData", json=create_pereval())
+            assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+            pereval_id = int(response.json()["share_link"].split("/")[-1])
+
+            created_id, event = await next_event(stream, pereval_id)
+            assert event == "created"
+
+            patch_data = create_pereval()
+            patch_data.pop("user")
+            response_patch = await client.patch(f"/submit/submitData/{pereval_id}", json=patch_data)
+            assert response_patch.status_code == 200
+            response_status = await client.patch(f"/submit/submitData/update-status/{pereval_id}?status=pending")
+            assert response_status.status_code == 200
+
+            assert (await next_event(stream, pereval_id))[1] == "updated"
+            assert (await next_event(stream, pereval_id))[1] == "status"
+        await stream.aclose()
+
+        # Клиент получил только событие создания и переподключается
+        stream = feed.stream(created_id)
+        await anext(stream)
+        updated_id, event = await next_event(stream, pereval_id)
+        assert event == "updated"
+        assert (await next_event(stream, pereval_id))[1] == "status"
+        await stream.aclose()
+
+        # Некорректный Last-Event-ID: клиент должен заново загрузить перевалы
+        stream = feed.stream("unknown")
+        await anext(stream)
+        assert (await next_event(stream, pereval_id))[1] == "reset"
+    finally:
+        await stream.aclose()
+        await feed.stop()
+
+
+@pytest.mark.asyncio
+async def test_pereval_events_feed_survives_errors():
+    """
+    Тест проверяет, что ошибка чтения журнала не останавливает фоновую задачу ленты.
+    """
+    feed = PerevalEventFeed(async_session_null_pool, poll_interval=0.01)
+    polls = []
+
+    async def failing_poll():
+        polls.append(len(polls))
+        raise RuntimeError("broken poll")
+
+    feed._poll = failing_poll
+    await feed.start()
+    try:
+        for _ in range(40):
+            if len(polls) >= 2:
+                break
+            await asyncio.sleep(0.1)
+        assert len(polls) >= 2
+        assert not feed._task.done()
+    finally:
+        await feed.stop()
+
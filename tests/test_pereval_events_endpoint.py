@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from main import app
+
+
+@pytest.mark.asyncio
+async def test_pereval_events_endpoint(transaction, create_pereval):
+    """
+    Тест проверяет, что эндпоинт отдает поток text/event-stream и завершается при отключении клиента.
+    """
+    sent = asyncio.Queue()
+    disconnected = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/events/perevals", "raw_path": b"/events/perevals", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"testserver")], "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, sent.put))
+
+    start = await asyncio.wait_for(sent.get(), timeout=5)
+    headers = dict(start["headers"])
+    assert start["status"] == 200
+    assert headers[b"content-type"].startswith(b"text/event-stream")
+    assert headers[b"cache-control"] == b"no-cache"
+    assert (await asyncio.wait_for(sent.get(), timeout=5))["body"] == b"retry: 3000\n\n"
+
+    disconnected.set()
+    await asyncio.wait_for(task, timeout=5)
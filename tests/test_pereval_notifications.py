@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.core.config import settings
+from src.db.notify import PerevalChangeListener
+
+
+@pytest.mark.asyncio
+async def test_pereval_notifications(transaction, create_pereval):
+    """
+    Тест проверяет, что создание и изменение перевала рассылаются через LISTEN/NOTIFY.
+    """
+    events = asyncio.Queue()
+    listener = PerevalChangeListener(settings.asyncpg_dsn, settings.pereval_notify_channel)
+    listener.register(lambda event, pereval_id: events.put_nowait((event, pereval_id)))
+    await listener.start()
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            response = await client.post("/submit/submitData", json=create_pereval())
+            assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+            pereval_id = int(response.json()["share_link"].split("/")[-1])
+
+            response_patch = await client.patch(f"/submit/submitData/update-status/{pereval_id}?status=pending")
+            assert response_patch.status_code == 200
+
+            received = set()
+            while received != {("created", pereval_id), ("status", pereval_id)}:
+                event = await asyncio.wait_for(events.get(), timeout=5)
+                if event[1] == pereval_id:
+                    received.add(event)
+    finally:
+        await listener.stop()
@@ -0,0 +1,57 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+
+
+@pytest.mark.asyncio
+async def test_pereval_version_if_match(transaction, create_pereval):
+    """
+    Тест проверяет оптимистичную блокировку: ETag содержит версию перевала, изменение с актуальным
+    If-Match проходит и увеличивает версию, а с устаревшим - завершается ответом 409.
+    """
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=create_pereval())
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        assert response.json()["version"] == 1
+        pereval_id = response.json()["share_link"].split("/")[-1]
+
+        response = await client.get(f"/submit/submitData/{pereval_id}")
+        etag = response.headers["ETag"]
+        assert etag == f'"{pereval_id}-1"'
+
+        # Автор меняет запись с актуальной версией
+        response = await client.patch(
+            f"/submit/submitData/{pereval_id}", json={"connect": "Новое описание"}, headers={"If-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["state"] == 1, response.json()
+        assert response.json()["version"] == 2
+        new_etag = response.headers["ETag"]
+        assert new_etag == f'"{pereval_id}-2"'
+
+        # Модератор прочитал запись до изменения автора
+        response = await client.patch(
+            f"/submit/submitData/update-status/{pereval_id}?status=accepted", headers={"If-Match": etag}
+        )
+        assert response.status_code == 409
+        assert response.json() == {"message": "Перевал был изменен другим запросом"}
+
+        response = await client.patch(
+            f"/submit/submitData/update-status/{pereval_id}?status=accepted", headers={"If-Match": new_etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["version"] == 3
+
+        # После модерации запись не редактируется, а статус не меняется
+        response = await client.patch(f"/submit/submitData/{pereval_id}", json={"connect": "Еще описание"})
+        assert response.json()["message"] == "Запись можно редактировать только в статусе new"
+
+        response = await client.patch(f"/submit/submitData/update-status/{pereval_id}?status=rejected")
+        assert response.status_code == 400
+
+        response = await client.patch("/submit/submitData/update-status/0?status=rejected")
+        assert response.status_code == 404
+
+        response = await client.get(f"/submit/submitData/{pereval_id}", headers={"If-None-Match": f'"{pereval_id}-3"'})
+        assert response.status_code == 304
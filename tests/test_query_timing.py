@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.db import db
+
+
+@pytest.mark.asyncio
+async def test_failed_query_does_not_skew_timing(transaction, create_pereval, monkeypatch):
+    """
+    Тест проверяет, что запрос с ошибкой не оставляет время начала на соединении пула
+    и не влияет на замер длительности следующего запроса.
+    """
+    durations = []
+    monkeypatch.setattr(db, "record_query", lambda name, duration: durations.append(duration))
+
+    async with db.engine.connect() as conn:
+        with pytest.raises(DBAPIError):
+            await conn.execute(text("SELECT 1 / 0"))
+        await conn.rollback()
+
+        await asyncio.sleep(0.2)
+        await conn.execute(text("SELECT 1"))
+        assert not conn.sync_connection.info.get("query_start_time")
+
+    assert len(durations) == 1
+    assert durations[0] < 0.2
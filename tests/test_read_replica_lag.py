@@ -0,0 +1,35 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from main import app
+from src.db import db
+
+
+@pytest.mark.asyncio
+async def test_read_replica_lag(transaction, create_pereval, monkeypatch):
+    """
+    Тест проверяет, что перевал, которого еще нет в реплике, читается из основной БД,
+    даже если у клиента нет cookie read-your-writes.
+    Отстающую реплику изображает сессия с моментальным снимком, снятым до создания перевала.
+    """
+    lagging_session = db.async_session_null_pool()
+    await lagging_session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    await lagging_session.execute(text("SELECT 1"))
+
+    monkeypatch.setattr(db, "engine_replica", db.engine_null_pool)
+    monkeypatch.setattr(db, "async_session_replica", lambda: lagging_session)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=create_pereval())
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        pereval_id = response.json()["share_link"].split("/")[-1]
+
+    # Ссылку открывает другой клиент, без cookie
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.get(f"/submit/submitData/{pereval_id}")
+        assert response.status_code == 200, response.text
+        assert response.json()["share_link"].endswith(f"/{pereval_id}")
+
+        response = await client.get("/submit/submitData/0")
+        assert response.status_code == 404
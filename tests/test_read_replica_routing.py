@@ -0,0 +1,53 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from main import app
+from src.core.config import settings
+from src.db import db
+from src.services.db_service import pereval_cache
+
+
+@pytest.mark.asyncio
+async def test_read_replica_routing(transaction, create_pereval, monkeypatch):
+    """
+    Тест проверяет, что чтение идет в реплику, клиент после своей записи читает из основной БД,
+    а прочитанное из реплики не кэшируется.
+    Роль реплики играет отдельный движок к той же БД.
+    """
+    monkeypatch.setattr(db, "engine_replica", db.engine_null_pool)
+    monkeypatch.setattr(db, "async_session_replica", db.async_session_null_pool)
+
+    replica_statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        replica_statements.append(statement)
+
+    event.listen(db.engine_null_pool.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            response = await client.post("/submit/submitData", json=create_pereval())
+            assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+            assert settings.read_your_writes_cookie in response.cookies
+            pereval_id = response.json()["share_link"].split("/")[-1]
+
+            # Свою запись клиент читает из основной БД
+            response = await client.get(f"/submit/submitData/{pereval_id}")
+            assert response.status_code == 200
+            assert replica_statements == []
+
+        # Клиент без cookie читает из реплики
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            response = await client.get(f"/submit/submitData/{pereval_id}")
+            assert response.status_code == 200
+            assert replica_statements
+            assert settings.read_your_writes_cookie not in response.cookies
+
+            # Ответ реплики не попадает в общий кэш: она может отставать от сброса кэша после записи
+            monkeypatch.setattr(settings, "pereval_cache_enabled", True)
+            pereval_cache.invalidate(int(pereval_id))
+            response = await client.get(f"/submit/submitData/{pereval_id}")
+            assert response.status_code == 200
+            assert pereval_cache.get(int(pereval_id)) is None
+    finally:
+        event.remove(db.engine_null_pool.sync_engine, "before_cursor_execute", before_cursor_execute)
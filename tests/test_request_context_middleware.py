@@ -0,0 +1,57 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.core.context import request_id
+from src.core.metrics import http_requests
+from src.core.middleware import RequestContextMiddleware
+
+
+@pytest.mark.asyncio
+async def test_request_id_header(transaction, create_pereval):
+    """
+    Тест проверяет, что входящий X-Request-ID возвращается в ответе,
+    а без заголовка (или с недопустимым значением) генерируется новый.
+    """
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=create_pereval(), headers={"X-Request-ID": "abc-123"})
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        assert response.headers["X-Request-ID"] == "abc-123"
+
+        response = await client.get("/submit/submitData/0")
+        assert response.status_code == 404
+        generated = response.headers["X-Request-ID"]
+        assert len(generated) == 32
+
+        response = await client.get("/submit/submitData/0", headers={"X-Request-ID": "bad id!"})
+        assert response.headers["X-Request-ID"] not in ("bad id!", generated)
+
+
+@pytest.mark.asyncio
+async def test_unhandled_exception_to_json():
+    """
+    Тест проверяет, что необработанное исключение превращается в ответ 500 в формате API,
+    идентификатор запроса доступен обработчику, а запрос учитывается в метриках.
+    """
+    test_app = FastAPI()
+    seen = {}
+
+    @test_app.get("/boom/{item_id}")
+    async def boom(item_id: int):
+        seen["request_id"] = request_id.get()
+        raise RuntimeError("boom")
+
+    test_app.add_middleware(RequestContextMiddleware)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=test_app, raise_app_exceptions=False), base_url="http://testserver"
+    ) as client:
+        response = await client.get("/boom/1", headers={"X-Request-ID": "req-1"})
+
+    assert response.status_code == 500
+    assert response.json() == {"message": "Internal server error"}
+    assert response.headers["X-Request-ID"] == "req-1"
+    assert seen["request_id"] == "req-1"
+    assert request_id.get() is None
+    assert http_requests._values[("GET", "/boom/{item_id}", "500")] == 1
@@ -0,0 +1,29 @@
+import json
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+
+from src.core.serialization import dump_json, dump_model, type_adapter
+from src.schemas.submit import SubmitDataResponse
+from tests.factories import generate_pereval
+
+
+def test_fast_serialization_matches_fastapi():
+    """
+    Тест проверяет, что dump_model и dump_json дают тот же JSON, что и стандартная сериализация FastAPI,
+    а TypeAdapter строится один раз на тип ответа.
+    """
+    # Колонки DateTime без часового пояса, как в БД
+    now = datetime(2026, 10, 18, 12, 30, 15, 123456)
+    items = [
+        {**generate_pereval(), "message": "Данные перевалов", "share_link": f"http://localhost/submit/get/{n}",
+         "status": "new", "add_time": now, "updated_at": None, "version": 1}
+        for n in range(3)
+    ]
+    models = [SubmitDataResponse(**item) for item in items]
+    expected = jsonable_encoder(models)
+
+    assert json.loads(dump_model(List[SubmitDataResponse], models)) == expected
+    assert json.loads(dump_json(items)) == expected
+    assert type_adapter(List[SubmitDataResponse]) is type_adapter(List[SubmitDataResponse])
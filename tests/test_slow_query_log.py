@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from src.core.config import settings
+from src.db.slow_queries import slow_query_logger
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(transaction, create_pereval, monkeypatch):
+    """
+    Тест проверяет запись медленных запросов: маршрут, метод сервиса, скрытые параметры
+    и план выполнения только для запросов на чтение.
+    """
+    monkeypatch.setattr(settings, "slow_query_log_enabled", True)
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    monkeypatch.setattr(settings, "slow_query_explain_sample_rate", 1.0)
+
+    collect = _Collect()
+    slow_query_logger.addHandler(collect)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            submit_data = create_pereval()
+            response = await client.post("/submit/submitData", json=submit_data)
+            assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+
+            create_messages = list(collect.messages)
+            collect.messages.clear()
+
+            email = submit_data["user"]["email"]
+            response = await client.get("/submit/submitData/by_user/", params={"user__email": email})
+            assert response.status_code == 200
+            assert len(response.json()) == 1
+    finally:
+        slow_query_logger.removeHandler(collect)
+
+    assert create_messages
+    assert all("маршрут: /submit/submitData |" in message for message in create_messages)
+    assert any("метод: SubmitService.create_pereval" in message for message in create_messages)
+    # Запрос с изменением данных повторно не выполняется
+    assert all("План:" not in message for message in create_messages)
+
+    messages = [message for message in collect.messages if "SubmitService.get_perevals_by_user_email" in message]
+    assert messages
+    assert all("маршрут: /submit/submitData/by_user/" in message for message in messages)
+    assert any("План:" in message and "Execution Time" in message for message in messages)
+    assert all(email not in message for message in collect.messages)
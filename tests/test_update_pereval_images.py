@@ -0,0 +1,82 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+
+from main import app
+from src.db.db import async_session_null_pool
+from src.models import PerevalImages
+from src.schemas.submit import ImageSchema
+from src.services.images import StoredImage, diff_images
+
+
+def test_diff_images():
+    stored = [
+        StoredImage(1, "a", "A", 0), StoredImage(2, "b", "B", 1), StoredImage(3, "c", "C", 2), StoredImage(4, "a", "A2", 3)
+    ]
+    images = [ImageSchema(url="d", title="D"), ImageSchema(url="a", title="A2"), ImageSchema(url="b", title="B new")]
+
+    diff = diff_images(stored, images)
+
+    assert diff.added == [(0, ImageSchema(url="d", title="D"))]
+    assert diff.removed == [StoredImage(1, "a", "A", 0), StoredImage(3, "c", "C", 2)]
+    assert diff.changed == [(StoredImage(4, "a", "A2", 3), "A2", 1), (StoredImage(2, "b", "B", 1), "B new", 2)]
+
+
+@pytest.mark.asyncio
+async def test_update_pereval_images_diff(transaction, create_pereval):
+    """
+    Тест проверяет, что при обновлении меняются только отличающиеся изображения, порядок изображений
+    сохраняется, а ответ содержит добавленные, удаленные, переименованные и перемещенные изображения.
+    """
+    submit_data = create_pereval()
+    kept, retitled = submit_data["images"]
+    submit_data["images"].append({"url": "https://example.com/removed.jpg", "title": "Removed"})
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=submit_data)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        pereval_id = int(response.json()["share_link"].split("/")[-1])
+
+        async with async_session_null_pool() as db:
+            ids_before = dict((await db.execute(
+                select(PerevalImages.image_url, PerevalImages.id).where(PerevalImages.pereval_id == pereval_id)
+            )).all())
+
+        update_data = {key: submit_data[key] for key in ("beauty_title", "title", "other_titles", "connect", "coords", "level")}
+        update_data["images"] = [
+            {"url": "https://example.com/added.jpg", "title": "Added"},
+            kept,
+            {"url": retitled["url"], "title": "Новое название"},
+        ]
+        response = await client.patch(f"/submit/submitData/{pereval_id}", json=update_data)
+        assert response.status_code == 200
+        result = response.json()
+        assert result["state"] == 1, result
+        assert result["images"] == {
+            "added": [{"url": "https://example.com/added.jpg", "title": "Added"}],
+            "removed": [{"url": "https://example.com/removed.jpg", "title": "Removed"}],
+            "retitled": [{"url": retitled["url"], "title": "Новое название"}],
+            "moved": [kept, {"url": retitled["url"], "title": "Новое название"}],
+        }
+
+        # Изображения читаются в переданном порядке
+        response = await client.get(f"/submit/submitData/{pereval_id}")
+        assert response.status_code == 200
+        assert response.json()["images"] == update_data["images"]
+
+        # Пустой список, как и отсутствие поля, изображения не меняет
+        response = await client.patch(f"/submit/submitData/{pereval_id}", json={**update_data, "images": []})
+        assert response.status_code == 200
+        assert response.json()["images"] is None
+
+        response = await client.get(f"/submit/submitData/{pereval_id}")
+        assert response.json()["images"] == update_data["images"]
+
+    async with async_session_null_pool() as db:
+        ids_after = dict((await db.execute(
+            select(PerevalImages.image_url, PerevalImages.id).where(PerevalImages.pereval_id == pereval_id)
+        )).all())
+
+    # Неизмененное и переименованное изображения сохранили свои строки
+    assert ids_after[kept["url"]] == ids_before[kept["url"]]
+    assert ids_after[retitled["url"]] == ids_before[retitled["url"]]
@@ -0,0 +1,45 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from main import app
+from src.db.db import engine
+from src.services.user_service import user_cache
+
+
+@pytest.mark.asyncio
+async def test_repeat_submitter_skips_users_table(transaction, create_pereval):
+    """
+    Тест проверяет, что повторная отправка от того же email не обращается к таблице users,
+    а несовпадение ФИО по-прежнему возвращает ошибку.
+    """
+    first = create_pereval()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        response = await client.post("/submit/submitData", json=first)
+        assert response.status_code == 200, f"Failed to create pereval: {response.text}"
+        assert user_cache.get(first["user"]["email"]) is not None
+
+        second = create_pereval()
+        second["user"] = first["user"]
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            response = await client.post("/submit/submitData", json=second)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+        assert response.status_code == 200, response.text
+        assert response.json()["user"] == first["user"]
+        assert len(statements) == 1
+        assert "users" not in statements[0]
+
+        third = create_pereval()
+        third["user"] = {**first["user"], "fam": first["user"]["fam"] + "-other"}
+        response = await client.post("/submit/submitData", json=third)
+        assert response.status_code == 400
+        assert first["user"]["email"] in response.json()["message"]